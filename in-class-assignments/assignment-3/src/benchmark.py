@@ -0,0 +1,127 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from crash.CrashColumns import CRASH_ID, LATITUDE, LONGITUDE
+from crash.CrashDataGenerator import generate_crash_files
+from crash.CrashDataSet import CHUNK_SIZE, CrashDataSet
+from crash.CrashDerivedColumns import DERIVED_COLUMNS
+from crash.CrashProfiler import CrashProfiler
+from crash.CrashRecordType import CrashRecordType
+
+logging.basicConfig(format="'%(asctime)s' %(name)s : %(message)s'", level=logging.INFO)
+logger = logging.getLogger('benchmark')
+
+# crashes of the benchmarked data sets, about 5.4 records each
+CRASH_COUNTS = [10000, 100000, 1000000]
+
+# lookups and queries timed per data set, from random crashes
+QUERIES = 1000
+QUERY_RADIUS_KM = 1.0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark loading, validating and querying generated crash data '
+                                                 'of growing sizes.')
+    parser.add_argument('--crashes', type=int, nargs='+', default=CRASH_COUNTS,
+                        help='crashes of every data set (default: %(default)s)')
+    parser.add_argument('--files', type=int, default=os.cpu_count(),
+                        help='files every data set is split into (default: %(default)s)')
+    parser.add_argument('--directory', help='directory the data sets are generated in and kept, '
+                                            'a temporary directory removed afterwards by default')
+    parser.add_argument('--random-seed', type=int, default=0, help='seed of the generated data (default: 0)')
+    parser.add_argument('--memory', action='store_true',
+                        help='trace the peak memory of every stage, which slows them down')
+    parser.add_argument('--json', metavar='FILE', help='write the timings of every data set to FILE')
+    return parser.parse_args()
+
+
+def benchmark(crashes, directory, args):
+    profiler = CrashProfiler(trace_memory=args.memory)
+    profiler.add_details(crashes=crashes)
+    profiler.start()
+
+    with profiler.stage('generate'):
+        manifest = generate_crash_files(directory, crashes, files=args.files, random_seed=args.random_seed)
+    with profiler.stage('load') as stage:
+        crash_data_set = CrashDataSet(manifest, use_cache=False)
+        stage['records'] = records = len(crash_data_set.records)
+    profiler.add_details(records=records)
+
+    # generated data keeps the rule failures of the data it is bootstrapped from, which are timed all the same
+    with profiler.stage('validate') as stage:
+        crash_data_set.validate_crash_data(raise_on_failure=False)
+        stage['records'] = records
+    with profiler.stage('validate streamed') as stage:
+        for path in CrashDataSet.get_data_files(manifest):
+            CrashDataSet.validate_crash_file(path, chunksize=CHUNK_SIZE, raise_on_failure=False)
+        stage['records'] = records
+    with profiler.stage('describe') as stage:
+        crash_data_set.describe()
+        stage['records'] = records
+
+    with profiler.stage('derived columns') as stage:
+        for name in DERIVED_COLUMNS:
+            crash_data_set.derived(name)
+        stage['records'] = len(crash_data_set.crashes)
+    with profiler.stage('decode') as stage:
+        crash_data_set.decode('WTHR_COND_CD')
+        crash_data_set.decode('INJ_SVRTY_CD', CrashRecordType.PARTICIPANT)
+        stage['records'] = len(crash_data_set.crashes) + len(crash_data_set.participants)
+
+    rng = np.random.default_rng(args.random_seed)
+    crash_ids = crash_data_set.crashes[CRASH_ID].to_numpy()[rng.integers(crashes, size=QUERIES)]
+    with profiler.stage('hierarchy') as stage:
+        hierarchy = crash_data_set.hierarchy
+        stage['records'] = records
+    with profiler.stage('hierarchy lookups') as stage:
+        for crash_id in crash_ids:
+            crash_data_set.get_crash_participants(crash_id)
+        stage['records'] = QUERIES
+
+    with profiler.stage('spatial index') as stage:
+        spatial_index = crash_data_set.spatial_index
+        stage['records'] = len(spatial_index)
+    latitudes, longitudes = crash_data_set.derived(LATITUDE), crash_data_set.derived(LONGITUDE)
+    positions = hierarchy.crash_order[[hierarchy.get_crash_position(crash_id) for crash_id in crash_ids]]
+    with profiler.stage('radius queries') as stage:
+        for latitude, longitude in zip(latitudes.iloc[positions], longitudes.iloc[positions]):
+            spatial_index.within_radius(latitude, longitude, QUERY_RADIUS_KM)
+        stage['records'] = QUERIES
+
+    with profiler.stage('cube') as stage:
+        crash_data_set.cube.rollup(['County Code', 'Crash Month'])
+        stage['records'] = len(crash_data_set.crashes)
+
+    profiler.stop()
+    return profiler.to_dict()
+
+
+def main():
+    args = parse_args()
+    root = args.directory or tempfile.mkdtemp(prefix='crash-benchmark-')
+    results = []
+    try:
+        for crashes in args.crashes:
+            logger.info('Benchmarking {} crashes ...'.format(crashes))
+            results.append(benchmark(crashes, os.path.join(root, str(crashes)), args))
+    finally:
+        if not args.directory:
+            shutil.rmtree(root, ignore_errors=True)
+
+    for result in results:
+        logger.info('{} crashes, {} records: {}'.format(result['crashes'], result['records'], ', '.join(
+            '{} {:.3f}s'.format(stage['name'], stage['seconds']) for stage in result['stages'])))
+    if args.json:
+        with open(args.json, mode='w') as file:
+            json.dump(results, file, indent=2)
+        logger.info('Wrote benchmark results to {}'.format(args.json))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+from crash.CrashRecordType import CrashRecordType
+from definitions import DATA_DIR
+
+# code sets of the code fields of the decode sheets, transcribed from the ODOT crash data code manual since the
+# sheets list the fields but not their codes
+CODES_FILE = os.path.join(DATA_DIR, 'decode_codes.csv')
+
+
+@lru_cache(maxsize=None)
+def read_code_sets(path=CODES_FILE):
+    """
+    Read the code sets of all code fields, once per file.
+
+    :return: dict of (CrashRecordType, Database Field Name) to Series of the label of every code, indexed by code
+    """
+    codes = pd.read_csv(path, dtype=str)
+    return {(CrashRecordType(int(record_type)), field): field_codes.set_index('Code')['Label']
+            for (record_type, field), field_codes in codes.groupby(['Record Type', 'Database Field Name'])}
+
+
+def decode(values, labels):
+    """
+    Decode a code column to its labels.
+
+    Every distinct code is matched to the code set once, the values are then remapped by their integer category
+    codes rather than looked up one by one. Codes missing from the code set decode to NaN.
+
+    :param values: Series of codes, numeric or categorical
+    :param labels: Series of the label of every code, indexed by code
+    :return: categorical Series of labels, aligned with values
+    """
+    codes = labels.index
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        codes = pd.to_numeric(codes).astype(values.dtype)
+
+    decoded = pd.Categorical(values, categories=codes).rename_categories(list(labels))
+    return pd.Series(decoded, index=values.index, name=values.name)
@@ -0,0 +1,39 @@
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_field_column
+
+# every constant is the column of the extract holding the field it is named after. Later header names are shifted
+# from the fields their values belong to (see CrashSchema.ABSENT_COLUMNS), so columns are looked up by field.
+COLLISION_TYPE = get_field_column(CrashRecordType.CRASH, 'COLLIS_TYP_CD')
+CRASH_TYPE = get_field_column(CrashRecordType.CRASH, 'CRASH_TYP_CD')
+CRASH_ID = get_field_column(CrashRecordType.CRASH, 'CRASH_ID')
+VEHICLE_ID = get_field_column(CrashRecordType.VEHICLE, 'VHCL_ID')
+PARTICIPANT_ID = get_field_column(CrashRecordType.PARTICIPANT, 'PARTIC_ID')
+PARTICIPANT_DISPLAY_SEQ = get_field_column(CrashRecordType.PARTICIPANT, 'PARTIC_DSPLY_SEQ_NO')
+VEHICLE_CODED_SEQ = get_field_column(CrashRecordType.VEHICLE, 'VHCL_CODED_SEQ_NO')
+PARTICIPANT_VEHICLE_SEQ = get_field_column(CrashRecordType.PARTICIPANT, 'PARTIC_VHCL_SEQ_NO')
+AGE = get_field_column(CrashRecordType.PARTICIPANT, 'AGE_VAL')
+SCHOOL_ZONE_INDICATOR = get_field_column(CrashRecordType.CRASH, 'SCHL_ZONE_IND')
+
+CRASH_YEAR = get_field_column(CrashRecordType.CRASH, 'CRASH_YR_NO')
+CRASH_MONTH = get_field_column(CrashRecordType.CRASH, 'CRASH_MO_NO')
+CRASH_DAY = get_field_column(CrashRecordType.CRASH, 'CRASH_DAY_NO')
+
+# the record type of every record, which is no field of the decode sheets
+RECORD_TYPE = 'Record Type'
+
+LATITUDE_DEGREES = get_field_column(CrashRecordType.CRASH, 'LAT_DEG_NO')
+LATITUDE_MINUTES = get_field_column(CrashRecordType.CRASH, 'LAT_MINUTE_NO')
+LATITUDE_SECONDS = get_field_column(CrashRecordType.CRASH, 'LAT_SEC_NO')
+LONGITUDE_DEGREES = get_field_column(CrashRecordType.CRASH, 'LONGTD_DEG_NO')
+LONGITUDE_MINUTES = get_field_column(CrashRecordType.CRASH, 'LONGTD_MINUTE_NO')
+LONGITUDE_SECONDS = get_field_column(CrashRecordType.CRASH, 'LONGTD_SEC_NO')
+
+# total fatality and total non-fatal injury counts of a crash, which the other counts break down
+FATALITY_COUNT = get_field_column(CrashRecordType.CRASH, 'TOT_FATAL_CNT')
+INJURY_COUNT = get_field_column(CrashRecordType.CRASH, 'TOT_INJ_CNT')
+
+# columns derived from the crash data, see CrashDerivedColumns
+CRASH_DATE = 'Crash Date'
+TOTAL_INJURY_FATALITY_COUNT = 'Total Injury and Fatality Count'
+LATITUDE = 'Latitude'
+LONGITUDE = 'Longitude'
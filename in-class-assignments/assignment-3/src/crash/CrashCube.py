@@ -0,0 +1,84 @@
+import pandas as pd
+
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_field_column
+
+# dimensions of the cube, by the crash field of their values
+CUBE_DIMENSIONS = {
+    'Crash Month': 'CRASH_MO_NO',
+    'Crash Day': 'CRASH_DAY_NO',
+    'Crash Hour': 'CRASH_HR_NO',
+    'Week Day Code': 'CRASH_WK_DAY_CD',
+    'County Code': 'CNTY_ID',
+    'Collision Type': 'COLLIS_TYP_CD',
+    'Crash Severity': 'CRASH_SVRTY_CD',
+}
+
+# measures of the cube summed over the crashes of a cell, by their crash field, besides the number of crashes
+CRASH_COUNT = 'Crash Count'
+CUBE_MEASURES = {
+    'Vehicle Count': 'TOT_VHCL_CNT',
+    'Fatality Count': 'TOT_FATAL_CNT',
+    'Injury Count': 'TOT_INJ_CNT',
+}
+
+
+class CrashCube:
+    """
+    Counts of crashes, vehicles, fatalities and injuries in every cell of the crash dimensions (month, day, hour,
+    week day, county, collision type and severity), aggregated once from the crash records.
+
+    Roll-ups and slices sum cells of the cube, not crash records. Appending crash records aggregates them alone
+    and adds their cells to the cube.
+    """
+
+    def __init__(self, crashes):
+        """
+        :param crashes: table of crash records
+        """
+        self._cells = self._aggregate(crashes)
+
+    @staticmethod
+    def _aggregate(crashes):
+        columns = {name: get_field_column(CrashRecordType.CRASH, field) for name, field in CUBE_DIMENSIONS.items()}
+        dimensions = pd.DataFrame({name: crashes[column].astype(object) for name, column in columns.items()})
+
+        measures = pd.DataFrame({name: crashes[get_field_column(CrashRecordType.CRASH, field)]
+                                 for name, field in CUBE_MEASURES.items()}).astype(pd.Int64Dtype()).fillna(0)
+        measures.insert(0, CRASH_COUNT, 1)
+
+        return pd.concat([dimensions, measures], axis=1) \
+            .groupby(list(CUBE_DIMENSIONS), dropna=False, sort=True) \
+            .sum()
+
+    @property
+    def cells(self):
+        """
+        DataFrame of the measures of every non-empty cell, indexed by the dimensions.
+        """
+        return self._cells
+
+    def append(self, crashes):
+        """
+        Add crash records to the cube, aggregating only them.
+        """
+        cells = pd.concat([self._cells, self._aggregate(crashes)])
+        self._cells = cells.groupby(level=list(CUBE_DIMENSIONS), dropna=False, sort=True).sum()
+
+    def rollup(self, dimensions=(), **filters):
+        """
+        Measures summed over every dimension but the given ones, e.g. rollup(['Crash Hour', 'Week Day Code']) or
+        rollup(['County Code', 'Crash Month'], **{'Crash Severity': 2}).
+
+        :param dimensions: dimensions kept, none to sum all cells
+        :param filters: values of dimensions the cells are sliced by, a value or a list of values per dimension
+        :return: DataFrame of the measures indexed by the dimensions, Series of the totals without dimensions
+        """
+        cells = self._cells
+        for dimension, values in filters.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            cells = cells[cells.index.get_level_values(dimension).isin(list(values))]
+
+        if not dimensions:
+            return cells.sum()
+        return cells.groupby(level=list(dimensions), dropna=False, sort=True).sum()
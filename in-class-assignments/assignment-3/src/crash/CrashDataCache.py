@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from definitions import DATA_DIR
+
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# size of the cached tables beyond which the least recently used entries are evicted
+MAX_CACHE_BYTES = 1 << 30
+
+# prefix of the directories entries are written to before being renamed, which eviction leaves alone
+TEMP_PREFIX = '.tmp-'
+
+
+class CrashDataCache:
+    """
+    On-disk cache of the tables parsed from a crash data file, stored as Feather files.
+
+    Entries are keyed by the file's absolute path, the SHA-256 of its content and a schema version, so a changed
+    file or schema misses the cache and the tables are parsed again. File hashes are remembered by path, size and
+    modification time, so an unchanged file is not re-read to be hashed.
+
+    Every time tables are cached, entries of files that no longer exist or whose hash is unknown (e.g. of an
+    older cache layout) are evicted, then the least recently used entries while the cache holds more than
+    max_bytes.
+    Needs pyarrow; without it nothing is cached.
+    """
+    _logger = logging.getLogger('CrashDataCache')
+
+    def __init__(self, schema_version, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self._schema_version = str(schema_version)
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._hashes_dir = os.path.join(cache_dir, 'file_hashes')
+
+    def get_tables(self, path, parse):
+        """
+        Get the tables of a crash data file from the cache, parsing and caching them on a miss.
+
+        :param path: crash data file
+        :param parse: function of the path returning a dict of table name to DataFrame
+        :return: dict of table name to DataFrame
+        """
+        entry_dir = self._get_entry_dir(path)
+
+        if os.path.isdir(entry_dir):
+            try:
+                tables = {os.path.splitext(name)[0]: pd.read_feather(os.path.join(entry_dir, name))
+                          for name in os.listdir(entry_dir)}
+                self._logger.debug('Read cached tables of %s from %s', path, entry_dir)
+                self._touch(entry_dir)
+                return tables
+            except (ImportError, OSError, ValueError) as ex:
+                self._logger.warning('Unable to read cached tables of %s, parsing it: %s', path, ex)
+
+        tables = parse(path)
+        self._put_tables(path, entry_dir, tables)
+        return tables
+
+    def _put_tables(self, path, entry_dir, tables):
+        os.makedirs(self._cache_dir, exist_ok=True)
+
+        # write the entry to a temporary directory and rename it, so a failed write never leaves a partial entry
+        temp_dir = tempfile.mkdtemp(prefix=TEMP_PREFIX, dir=self._cache_dir)
+        try:
+            for name, table in tables.items():
+                table.to_feather(os.path.join(temp_dir, '{}.feather'.format(name)))
+        except (ImportError, OSError, ValueError) as ex:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            self._logger.warning('Unable to cache the tables of %s: %s', path, ex)
+            return
+
+        self._remove_entries(path)
+        os.replace(temp_dir, entry_dir)
+        self._logger.debug('Cached tables of %s in %s', path, entry_dir)
+        self._evict_entries(entry_dir)
+
+    # older entries of a file are stale once the file or schema changed
+    def _remove_entries(self, path):
+        prefix = self._get_entry_prefix(path)
+        for name in os.listdir(self._cache_dir):
+            if name.startswith(prefix):
+                shutil.rmtree(os.path.join(self._cache_dir, name), ignore_errors=True)
+
+    # the modification time of an entry is the last time it was used
+    @staticmethod
+    def _touch(entry_dir):
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+
+    # entries are named after the digest of their file's path, which the file's hash records; entries without a
+    # known hash, or whose file is gone, can never be read again
+    def _evict_entries(self, kept_entry_dir):
+        source_paths = {}
+        for name in os.listdir(self._hashes_dir) if os.path.isdir(self._hashes_dir) else []:
+            hash_file = os.path.join(self._hashes_dir, name)
+            file_hash = self._read_file_hash(hash_file)
+            if file_hash and os.path.exists(file_hash['path']):
+                source_paths[name[:12]] = file_hash['path']
+            elif file_hash:
+                try:
+                    os.remove(hash_file)
+                except OSError:
+                    pass
+
+        entries = []
+        for name in os.listdir(self._cache_dir):
+            entry_dir = os.path.join(self._cache_dir, name)
+            if name.startswith(TEMP_PREFIX) or entry_dir == kept_entry_dir or not os.path.isdir(entry_dir) \
+                    or entry_dir == self._hashes_dir:
+                continue
+            name_parts = name.rsplit('-', 2)
+            source_path = source_paths.get(name_parts[1]) if len(name_parts) == 3 else None
+            if source_path is None:
+                self._logger.debug('Evicting cached tables %s of a missing or unknown file', name)
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                continue
+            try:
+                entries.append((os.stat(entry_dir).st_mtime, self._get_size(entry_dir), entry_dir))
+            except OSError:
+                pass
+
+        cache_bytes = self._get_size(kept_entry_dir) + sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if cache_bytes <= self._max_bytes:
+                break
+            self._logger.debug('Evicting least recently used cached tables %s', entry_dir)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            cache_bytes -= size
+
+    @staticmethod
+    def _get_size(entry_dir):
+        try:
+            return sum(entry.stat().st_size for entry in os.scandir(entry_dir))
+        except OSError:
+            return 0
+
+    # files of the same name in different directories get different entries
+    def _get_entry_prefix(self, path):
+        return '{}-{}-'.format(os.path.basename(path), self._get_path_digest(path)[:12])
+
+    @staticmethod
+    def _get_path_digest(path):
+        return hashlib.sha256(os.path.abspath(path).encode()).hexdigest()
+
+    def _get_entry_dir(self, path):
+        key = hashlib.sha256('{}:{}'.format(self._get_file_hash(path), self._schema_version).encode()).hexdigest()
+        return os.path.join(self._cache_dir, self._get_entry_prefix(path) + key[:16])
+
+    def _get_file_hash(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        hash_file = os.path.join(self._hashes_dir, self._get_path_digest(path) + '.json')
+
+        known = self._read_file_hash(hash_file)
+        if known and known['path'] == path and known['size'] == stat.st_size \
+                and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        sha256 = hashlib.sha256()
+        with open(path, mode='rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                sha256.update(block)
+
+        self._write_file_hash(hash_file, {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                                          'sha256': sha256.hexdigest()})
+        return sha256.hexdigest()
+
+    @staticmethod
+    def _read_file_hash(hash_file):
+        try:
+            with open(hash_file) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    # every file's hash is kept in a file of its own, so processes caching different files never overwrite each
+    # other's hashes; a temporary file renamed in place keeps readers from seeing a partial write
+    def _write_file_hash(self, hash_file, file_hash):
+        os.makedirs(self._hashes_dir, exist_ok=True)
+        temp_fd, temp_file = tempfile.mkstemp(dir=self._hashes_dir, suffix='.tmp')
+        with os.fdopen(temp_fd, mode='w') as file:
+            json.dump(file_hash, file, indent=2)
+        os.replace(temp_file, hash_file)
@@ -0,0 +1,224 @@
+import csv
+import datetime
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from crash.CrashCodes import read_code_sets
+from crash.CrashColumns import CRASH_ID, LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS, LONGITUDE_DEGREES, \
+    LONGITUDE_MINUTES, LONGITUDE_SECONDS, PARTICIPANT_ID, RECORD_TYPE, VEHICLE_ID
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_field_column
+from crash.CrashSpatialIndex import KM_PER_DEGREE
+from definitions import DATA_DIR
+
+SEED_FILE = os.path.join(DATA_DIR, 'OR-Hwy-26-crashes-2019.csv')
+
+# first IDs of the generated records, above the IDs of real crash data
+FIRST_CRASH_ID = 100000000
+FIRST_VEHICLE_ID = 1000000000
+FIRST_PARTICIPANT_ID = 1000000000
+
+# crashes generated and written at a time, which bounds the memory used whatever the number of crashes
+BATCH_SIZE = 50000
+
+# standard deviation of the distance generated crashes are moved from the crash they copy, in km
+LOCATION_JITTER_KM = 0.5
+
+# crash fields drawn from their code set in the decode sheets rather than copied, weighted by how often the seed
+# crashes have every code; codes the seed crashes lack keep a small weight
+DRAWN_CODE_FIELDS = ['WTHR_COND_CD', 'RD_SURF_COND_CD', 'LGT_COND_CD']
+UNSEEN_CODE_WEIGHT = 0.5
+
+
+def _to_ints(values):
+    return pd.to_numeric(values.replace('', np.nan)).to_numpy(dtype='float64', copy=True)
+
+
+# degrees, minutes and seconds columns of decimal degrees, signed like the decimal degrees
+def _to_degrees_minutes_seconds(decimal_degrees):
+    absolute = np.abs(decimal_degrees)
+    degrees = np.floor(absolute)
+    minutes = np.floor((absolute - degrees) * 60)
+    seconds = np.round((absolute - degrees - minutes / 60) * 3600, 2).clip(0, 59.99)
+    return (np.copysign(degrees, decimal_degrees).astype(np.int64).astype(str), minutes.astype(np.int64).astype(str),
+            seconds.astype(str))
+
+
+class CrashDataGenerator:
+    """
+    Synthetic crash data in the layout of the ODOT crash data files, of any number of crashes.
+
+    Every generated crash copies a crash of the seed file with its vehicle and participant records, so counts,
+    codes and ages stay consistent across the three record levels and follow the seed's distributions. The copy
+    gets new Crash, Vehicle and Participant IDs, a date drawn from the given years, a location moved by about
+    LOCATION_JITTER_KM, and weather, road surface and light conditions drawn from their code sets.
+    """
+    _logger = logging.getLogger('CrashDataGenerator')
+
+    def __init__(self, seed_file=SEED_FILE, random_seed=None):
+        """
+        :param seed_file: crash data file the generated crashes copy
+        :param random_seed: seed of the random generator, for reproducible data
+        """
+        # read as text and written back as text, the fields copied from the seed keep their formatting
+        self._seed = pd.read_csv(seed_file, dtype=str, keep_default_na=False)
+        self._rng = np.random.default_rng(random_seed)
+
+        record_types = _to_ints(self._seed[RECORD_TYPE])
+        self._crash_starts = np.flatnonzero(record_types == CrashRecordType.CRASH.value)
+        if not len(self._crash_starts):
+            raise ValueError('No crash records in the seed file {}'.format(seed_file))
+        self._crash_lengths = np.diff(np.append(self._crash_starts, len(self._seed)))
+
+        # vehicle IDs are generated as an offset from the crash's first vehicle, within a span per crash
+        crash_positions = np.repeat(np.arange(len(self._crash_starts)), self._crash_lengths)
+        vehicle_ids = _to_ints(self._seed[VEHICLE_ID])
+        vehicle_ids[vehicle_ids == 0] = np.nan
+        first_vehicle_ids = pd.Series(vehicle_ids).groupby(crash_positions).transform('min').to_numpy()
+        self._vehicle_offsets = vehicle_ids - first_vehicle_ids
+        self._vehicle_id_span = int(np.nan_to_num(np.nanmax(self._vehicle_offsets, initial=0))) + 1
+
+        self._is_crash = record_types == CrashRecordType.CRASH.value
+        self._is_participant = record_types == CrashRecordType.PARTICIPANT.value
+        self._max_participants = int(np.bincount(crash_positions, weights=self._is_participant).max())
+        self._locations = {column: _to_ints(self._seed[column]) for column in
+                           [LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS,
+                            LONGITUDE_DEGREES, LONGITUDE_MINUTES, LONGITUDE_SECONDS]}
+        self._code_weights = self._get_code_weights()
+
+    def _get_code_weights(self):
+        code_sets = read_code_sets()
+        code_weights = {}
+        for field in DRAWN_CODE_FIELDS:
+            column = get_field_column(CrashRecordType.CRASH, field)
+            counts = self._seed.loc[self._is_crash, column].value_counts()
+            codes = code_sets[(CrashRecordType.CRASH, field)].index
+            weights = counts.reindex(codes).fillna(UNSEEN_CODE_WEIGHT).to_numpy(dtype='float64')
+            code_weights[column] = (np.asarray(codes), weights / weights.sum())
+        return code_weights
+
+    def generate(self, path, crashes, first_crash=0, years=(2019,), batch_size=BATCH_SIZE):
+        """
+        Write a crash data file of generated crashes.
+
+        :param path: file written
+        :param crashes: number of crashes
+        :param first_crash: number of crashes generated before, by other calls or processes; IDs are unique across
+            calls given distinct ranges of crashes
+        :param years: first and last year of the crash dates, or a single year; dates are in the past
+        :param batch_size: crashes generated and written at a time
+        :return: number of records written
+        """
+        first_date = datetime.date(min(years), 1, 1)
+        last_date = min(datetime.date(max(years), 12, 31), datetime.date.today() - datetime.timedelta(days=1))
+        if last_date < first_date:
+            raise ValueError('No past dates in the years {}'.format(years))
+
+        records = 0
+        with open(path, mode='w', newline='') as file:
+            # every value is text already, the csv writer writes it several times faster than DataFrame.to_csv
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(self._seed.columns)
+            for batch_start in range(0, crashes, batch_size):
+                batch = self._generate_batch(first_crash + batch_start, min(batch_size, crashes - batch_start),
+                                             first_date, (last_date - first_date).days + 1)
+                writer.writerows(zip(*(batch[column].tolist() for column in batch.columns)))
+                records += len(batch)
+        self._logger.info('Generated {} crashes, {} records in {}'.format(crashes, records, path))
+        return records
+
+    def _generate_batch(self, first_crash, crashes, first_date, days):
+        copied = self._rng.integers(len(self._crash_starts), size=crashes)
+        lengths = self._crash_lengths[copied]
+        rows = np.repeat(self._crash_starts[copied] - np.cumsum(lengths) + lengths, lengths) + \
+            np.arange(lengths.sum())
+        crash_numbers = np.repeat(first_crash + np.arange(crashes), lengths)
+
+        batch = self._seed.iloc[rows].reset_index(drop=True)
+        batch[CRASH_ID] = (FIRST_CRASH_ID + crash_numbers).astype(str)
+
+        vehicle_offsets = self._vehicle_offsets[rows]
+        vehicle_ids = FIRST_VEHICLE_ID + crash_numbers * self._vehicle_id_span + np.nan_to_num(vehicle_offsets)
+        has_vehicle_id = ~np.isnan(vehicle_offsets)
+        batch.loc[has_vehicle_id, VEHICLE_ID] = vehicle_ids[has_vehicle_id].astype(np.int64).astype(str)
+
+        # participant IDs are numbered by row, every crash before the batch has at most the seed's most participants
+        is_participant = self._is_participant[rows]
+        participant_numbers = np.cumsum(is_participant) - 1
+        first_participant_id = FIRST_PARTICIPANT_ID + first_crash * self._max_participants
+        batch.loc[is_participant, PARTICIPANT_ID] = \
+            (first_participant_id + participant_numbers[is_participant]).astype(str)
+
+        is_crash = self._is_crash[rows]
+        self._set_crash_dates(batch, is_crash, first_date, days)
+        self._set_locations(batch, is_crash, rows[is_crash])
+        for column, (codes, weights) in self._code_weights.items():
+            batch.loc[is_crash, column] = self._rng.choice(codes, size=crashes, p=weights)
+        return batch
+
+    def _set_crash_dates(self, batch, is_crash, first_date, days):
+        dates = pd.to_datetime(first_date) + pd.to_timedelta(self._rng.integers(days, size=is_crash.sum()), unit='D')
+        batch.loc[is_crash, get_field_column(CrashRecordType.CRASH, 'CRASH_YR_NO')] = dates.year.astype(str)
+        batch.loc[is_crash, get_field_column(CrashRecordType.CRASH, 'CRASH_MO_NO')] = dates.month.astype(str)
+        batch.loc[is_crash, get_field_column(CrashRecordType.CRASH, 'CRASH_DAY_NO')] = dates.day.astype(str)
+        # week days are coded from 1 for Sunday to 7 for Saturday
+        batch.loc[is_crash, get_field_column(CrashRecordType.CRASH, 'CRASH_WK_DAY_CD')] = \
+            ((dates.dayofweek + 1) % 7 + 1).astype(str)
+
+    # decimal degrees of the degrees, minutes and seconds columns of the seed rows, NaN where missing
+    def _get_decimal_degrees(self, degrees_column, minutes_column, seconds_column, rows):
+        degrees = self._locations[degrees_column][rows]
+        return np.copysign(np.abs(degrees) + self._locations[minutes_column][rows] / 60 +
+                           self._locations[seconds_column][rows] / 3600, degrees)
+
+    def _set_locations(self, batch, is_crash, crash_rows):
+        latitude_columns = [LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS]
+        longitude_columns = [LONGITUDE_DEGREES, LONGITUDE_MINUTES, LONGITUDE_SECONDS]
+        latitudes = self._get_decimal_degrees(*latitude_columns, crash_rows)
+        longitudes = self._get_decimal_degrees(*longitude_columns, crash_rows)
+
+        km_per_longitude_degree = KM_PER_DEGREE * np.cos(np.radians(np.nan_to_num(latitudes)))
+        latitudes = latitudes + self._rng.normal(scale=LOCATION_JITTER_KM / KM_PER_DEGREE, size=len(latitudes))
+        longitudes = longitudes + self._rng.normal(scale=LOCATION_JITTER_KM / km_per_longitude_degree)
+
+        for columns, decimal_degrees in [(latitude_columns, latitudes), (longitude_columns, longitudes)]:
+            located = ~np.isnan(decimal_degrees)
+            is_located = is_crash.copy()
+            is_located[is_crash] = located
+            for column, values in zip(columns, _to_degrees_minutes_seconds(decimal_degrees[located])):
+                batch.loc[is_located, column] = values
+
+
+def _generate_file(path, crashes, first_crash, seed_file, random_seed, years):
+    return CrashDataGenerator(seed_file, random_seed).generate(path, crashes, first_crash=first_crash, years=years)
+
+
+def generate_crash_files(directory, crashes, files=1, seed_file=SEED_FILE, random_seed=0, years=(2019,)):
+    """
+    Write crash data files of generated crashes, one per process, and a manifest listing them (see
+    CrashDataSet.get_data_files). Crash, Vehicle and Participant IDs are unique across the files.
+
+    :param directory: directory of the files, created when missing
+    :param crashes: number of crashes across all files
+    :param files: number of files the crashes are split into
+    :param seed_file: crash data file the generated crashes copy
+    :param random_seed: seed of the random generators, every file has its own
+    :param years: first and last year of the crash dates, or a single year
+    :return: path of the manifest
+    """
+    os.makedirs(directory, exist_ok=True)
+    first_crashes = [crashes * index // files for index in range(files + 1)]
+    paths = [os.path.join(directory, 'crashes-{}.csv'.format(index)) for index in range(files)]
+
+    with ProcessPoolExecutor(max_workers=min(files, os.cpu_count())) as executor:
+        list(executor.map(_generate_file, paths, np.diff(first_crashes), first_crashes[:-1], [seed_file] * files,
+                          [[random_seed, index] for index in range(files)], [years] * files))
+
+    manifest = os.path.join(directory, 'crashes.txt')
+    with open(manifest, mode='w') as file:
+        file.writelines(os.path.basename(path) + '\n' for path in paths)
+    return manifest
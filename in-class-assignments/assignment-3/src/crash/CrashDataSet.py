@@ -1,144 +1,433 @@
+import glob
 import logging
 import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
-from datetime import datetime
 
+from crash.CrashCodes import decode, read_code_sets
+from crash.CrashColumns import CRASH_ID, LATITUDE, LONGITUDE
+from crash.CrashCube import CrashCube
+from crash.CrashDataCache import CrashDataCache
+from crash.CrashDerivedColumns import DERIVED_COLUMNS
+from crash.CrashDescriber import CrashDescriber
+from crash.CrashHierarchy import CrashHierarchy
+from crash.CrashPostgresExporter import CrashPostgresExporter
 from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_dtypes, get_field_column
+from crash.CrashSpatialIndex import CrashSpatialIndex
+from crash.CrashTables import TABLE_NAMES, split_records
+from crash.CrashValidationRules import CRASH_VALIDATION_RULES
+from crash.CrashValidator import DERIVED_COLUMNS_TIMING, CrashValidator
 from definitions import DATA_DIR
 
-COLLISION_TYPE = 'Collision Type'
-CRASH_TYPE = 'Crash Type'
-CRASH_ID = 'Crash ID'
-AGE = 'Age'
-SCHOOL_ZONE_INDICATOR = 'School Zone Indicator'
-
-CRASH_YEAR = 'Crash Year'
-CRASH_MONTH = 'Crash Month'
-CRASH_DAY = 'Crash Day'
+# version of the dtypes and table layout of the parsed crash data, bump it to invalidate cached tables
+SCHEMA_VERSION = 2
 
-RECORD_TYPE = 'Record Type'
+DATA_FILE = os.path.join(DATA_DIR, 'OR-Hwy-26-crashes-2019.csv')
 
-INJURY_COUNT_FIELDS = {
-    'Total Suspected Serious Injury (A) Count',
-    'Total Suspected Minor Injury (B) Count',
-    'Total Possible Injury (C) Count',
-    'Total Non-Fatal Injury Count',
-    'Total Pedestrian Non-Fatal Injury Count',
-    'Total Pedalcyclist Non-Fatal Injury Count',
-    'Total Unknown Non-Motorist Injury Count'
-}
+# records read at a time when streaming a crash data file
+CHUNK_SIZE = 100000
 
-FATALITY_COUNT_FIELDS = {
-    'Total Fatality Count',
-    'Total Pedestrian Fatality Count',
-    'Total Pedalcyclist Fatality Count',
-    'Total Unknown Non-Motorist Fatality Count'
-}
+# extension of manifests, text files listing one crash data file or glob pattern per line
+MANIFEST_EXTENSION = '.txt'
 
 
 class CrashDataSet:
     _logger = logging.getLogger('CrashDataSet')
 
-    def __init__(self):
-        self._df = self._load_data_as_df()
-        self._group_by_crash = self._df.groupby(CRASH_ID)
+    def __init__(self, files=DATA_FILE, use_cache=True):
+        """
+        :param files: crash data file, glob pattern, manifest or list of these, see get_data_files
+        :param use_cache: whether to reuse the tables cached by an earlier run, see CrashDataCache
+        """
+        self._paths = []
+        self._file_profiles = []
+        self._validator = CrashValidator(CRASH_VALIDATION_RULES)
+        self._tables = None
+        self._aggregates = None
+        self._cube = None
+        self.append(files, use_cache)
+
+    def append(self, files, use_cache=True):
+        """
+        Add the records of more crash data files. Indexes are rebuilt on their next use; the validation aggregates,
+        the crash cube and the derived columns read by the rules are updated with the added records alone, other
+        derived columns are derived again on their next use.
+
+        :param files: crash data file, glob pattern, manifest or list of these, see get_data_files
+        :param use_cache: whether to reuse the tables cached by an earlier run, see CrashDataCache
+        """
+        paths = self.get_data_files(files)
+        previous_derived = None if self._tables is None else self._derived
+
+        # one file per worker: every worker parses its file and computes the validation aggregates over it, and
+        # traces its own memory while this process does, which tracemalloc does not see across processes
+        if len(paths) == 1:
+            file_results = [self._ingest_file(paths[0], use_cache)]
+        else:
+            with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count())) as executor:
+                file_results = list(executor.map(self._ingest_file, paths, [use_cache] * len(paths),
+                                                 [tracemalloc.is_tracing()] * len(paths)))
+
+        added_tables = self._concat_tables([file_tables for file_tables, _, _, _ in file_results])
+        if self._tables is None:
+            tables = added_tables
+        else:
+            tables = {name: self._tables[record_type] for record_type, name in TABLE_NAMES.items()}
+            tables = self._concat_tables([tables, added_tables])
+        self._tables = {record_type: tables[name] for record_type, name in TABLE_NAMES.items()}
+
+        # checks across files, e.g. of Crash IDs repeated in several files, are evaluated from the combined aggregates
+        for _, file_aggregates, _, file_profile in file_results:
+            self._aggregates = file_aggregates if self._aggregates is None \
+                else self._validator.combine(self._aggregates, file_aggregates)
+            self._validator.add_compute_seconds(file_profile.pop('compute_seconds'))
+            self._file_profiles.append(file_profile)
+
+        if self._cube is not None:
+            self._cube.append(added_tables[TABLE_NAMES[CrashRecordType.CRASH]])
+
+        self._paths += paths
+        self._decoded = {}
+        self._derived = self._concat_derived(previous_derived, [file_derived for _, _, file_derived, _ in file_results])
+        self._spatial_index = None
+        self._hierarchy = None
+        self._ordered_vehicles = None
+        self._ordered_participants = None
 
     @staticmethod
-    def _load_data_as_df():
-        df_dtype = {CRASH_YEAR: pd.Int16Dtype(), CRASH_MONTH: pd.Int16Dtype(), CRASH_DAY: pd.Int16Dtype(), COLLISION_TYPE: pd.Int16Dtype()}
+    def get_data_files(files):
+        """
+        Paths of crash data files, in the order given.
+
+        :param files: crash data file, glob pattern, manifest listing one file or glob pattern per line relative to
+            the manifest's directory, or list of any of these
+        :return: list of paths
+        :raises FileNotFoundError: when a file, pattern or manifest names no file
+        """
+        if not isinstance(files, str):
+            return list(dict.fromkeys(path for file in files for path in CrashDataSet.get_data_files(file)))
+
+        if files.endswith(MANIFEST_EXTENSION):
+            with open(files) as manifest:
+                lines = [line.strip() for line in manifest]
+            return CrashDataSet.get_data_files([os.path.join(os.path.dirname(files), line)
+                                                for line in lines if line and not line.startswith('#')])
+
+        paths = sorted(glob.glob(files))
+        if not paths:
+            raise FileNotFoundError('No crash data file matches {}'.format(files))
+        return paths
+
+    @classmethod
+    def _ingest_file(cls, path, use_cache, trace_memory=False):
+        if trace_memory:
+            tracing = tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+            start_memory = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        if use_cache:
+            tables = CrashDataCache(SCHEMA_VERSION).get_tables(path, cls._parse_tables)
+        else:
+            tables = cls._parse_tables(path)
+        load_seconds = time.perf_counter() - start
+
+        # the derived columns read by the rules are computed once, by the worker of the file in parallel with the
+        # other files, then given to the validator and returned to be memoized by the data set
+        validator = CrashValidator(CRASH_VALIDATION_RULES)
+        start = time.perf_counter()
+        derived = {name: DERIVED_COLUMNS[name].compute(tables[TABLE_NAMES[DERIVED_COLUMNS[name].record_type]])
+                   .rename(name) for name in validator.derived_columns}
+        validator.add_compute_seconds({DERIVED_COLUMNS_TIMING: time.perf_counter() - start})
+        aggregates = validator.compute(tables={record_type: tables[name] for record_type, name in TABLE_NAMES.items()},
+                                       derived=derived)
+        file_profile = {'path': path, 'records': len(tables[TABLE_NAMES[None]]), 'load_seconds': load_seconds,
+                        'compute_seconds': dict(validator.compute_seconds)}
+        if trace_memory:
+            file_profile['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - start_memory
+            if not tracing:
+                tracemalloc.stop()
+        return tables, aggregates, derived, file_profile
+
+    # derived columns of the files added, after the memoized columns of the records already held; a column not
+    # memoized yet is derived again on its first use
+    @staticmethod
+    def _concat_derived(previous_derived, file_derived):
+        derived_columns = [previous_derived] + file_derived if previous_derived is not None else file_derived
+        names = set.intersection(*(set(derived) for derived in derived_columns))
+        if len(derived_columns) == 1:
+            return {name: derived_columns[0][name] for name in names}
+        return {name: pd.concat([derived[name] for derived in derived_columns], ignore_index=True) for name in names}
+
+    # tables of several files, categorical columns keep being categorical across differing categories
+    @staticmethod
+    def _concat_tables(file_tables):
+        if len(file_tables) == 1:
+            return file_tables[0]
+
+        tables = {}
+        for name, table in file_tables[0].items():
+            categorical_columns = [column for column, dtype in table.dtypes.items()
+                                   if isinstance(dtype, pd.CategoricalDtype)]
+            tables[name] = pd.concat([tables_of_file[name] for tables_of_file in file_tables], ignore_index=True) \
+                .astype({column: 'category' for column in categorical_columns})
+        return tables
+
+    # split the mixed-record file once into one table per record type, the wide frame is not kept
+    @classmethod
+    def _parse_tables(cls, path):
+        tables = split_records(cls._load_data_as_df(path))
+        return {TABLE_NAMES[record_type]: table for record_type, table in tables.items()}
+
+    # every column is read with the dtype of its field in the decode sheets, see CrashSchema
+    @staticmethod
+    def _load_data_as_df(path, usecols=None, chunksize=None):
+        columns = pd.read_csv(path, nrows=0).columns
+        return pd.read_csv(path, dtype=get_dtypes(columns), usecols=usecols, chunksize=chunksize)
 
-        for count_field in INJURY_COUNT_FIELDS.union(FATALITY_COUNT_FIELDS):
-            df_dtype[count_field] = pd.Int16Dtype()
+    @property
+    def records(self):
+        """
+        Key columns (Crash ID, Record Type, Vehicle ID, Participant ID) of every record in the crash data.
+        """
+        return self._tables[None]
 
-        return pd.read_csv(os.path.join(DATA_DIR, 'OR-Hwy-26-crashes-2019.csv'), dtype=df_dtype)
+    @property
+    def crashes(self):
+        """
+        Crash level records, one per crash.
+        """
+        return self._tables[CrashRecordType.CRASH]
 
-    def validate_crash_data(self):
-        self._logger.info("Validating crash data ...")
+    @property
+    def vehicles(self):
+        """
+        Vehicle records, linked to their crash by Crash ID.
+        """
+        return self._tables[CrashRecordType.VEHICLE]
 
-        assert not self._df.empty, 'Crash Dataframe is empty'
+    @property
+    def participants(self):
+        """
+        Participant records, linked to their crash by Crash ID and to their vehicle by Vehicle ID.
+        """
+        return self._tables[CrashRecordType.PARTICIPANT]
 
-        valid_record_types = list(map(int, CrashRecordType))
-        for record_type in self._df[RECORD_TYPE].unique():
-            assert record_type in valid_record_types, 'Unable to find {} record type in {}'.format(record_type, CrashRecordType.__class__.name)
+    @property
+    def cube(self):
+        """
+        CrashCube of the crash records, built on first use and updated as records are appended.
+        """
+        if self._cube is None:
+            self._cube = CrashCube(self.crashes)
+        return self._cube
 
-        # validate crash dates
-        self._validate_and_get_crash_dates()
+    @property
+    def hierarchy(self):
+        """
+        CrashHierarchy of the vehicles and participants of every crash, built on first use.
+        """
+        if self._hierarchy is None:
+            self._hierarchy = CrashHierarchy(self.crashes, self.vehicles, self.participants)
+            # copies of the tables in the hierarchy's order, the records of a crash are then a slice of rows
+            self._ordered_vehicles = self.vehicles.iloc[self._hierarchy.vehicle_order]
+            self._ordered_participants = self.participants.iloc[self._hierarchy.participant_order]
+        return self._hierarchy
+
+    def get_crash_vehicles(self, crash_id):
+        """
+        Vehicle records of a crash, ordered by Vehicle ID.
 
-        # every crash has at least 1 vehicle associated with it
-        for crash_id, crash_group in self._group_by_crash:
-            assert not crash_group[crash_group[RECORD_TYPE] == CrashRecordType.VEHICLE].empty, 'Found no vehicle for crash id {}'.format(crash_id)
+        :raises KeyError: when there is no crash of that Crash ID
+        """
+        hierarchy = self.hierarchy
+        return self._ordered_vehicles.iloc[hierarchy.get_vehicle_slice(hierarchy.get_crash_position(crash_id))]
 
-        # crash participants age is not negative
-        participants_with_age = self._df[self._df[RECORD_TYPE] == CrashRecordType.PARTICIPANT] \
-            .dropna(subset=[AGE])
-        assert all(participants_with_age[AGE] >= 0), 'Age of some participant(s) is negative'
+    def get_crash_participants(self, crash_id):
+        """
+        Participant records of a crash, ordered by Vehicle ID and Participant ID.
 
-        # there is at least 1 fatality or injury for a given crash
-        crashes = self._df[self._df[RECORD_TYPE] == CrashRecordType.CRASH]
-        assert all(crashes.apply(self._get_total_fatality_and_injury_count, axis=1) > 1), 'At least 1 crash has no fatality and/or injury'
+        :raises KeyError: when there is no crash of that Crash ID
+        """
+        hierarchy = self.hierarchy
+        return self._ordered_participants.iloc[
+            hierarchy.get_participant_slice(hierarchy.get_crash_position(crash_id))]
 
-        # every crash has a unique id
-        assert len(list(self._group_by_crash.groups)) == len(set(self._group_by_crash.groups)), 'Some Crash ID(s) is/are not unique'
+    def decode(self, field, record_type=CrashRecordType.CRASH):
+        """
+        Labels of a code field, e.g. decode('WTHR_COND_CD') or decode('INJ_SVRTY_CD', CrashRecordType.PARTICIPANT).
+        Decoded on first access and cached, see CrashCodes.
 
-        # most crashes happen outside of school zones
-        crashes_in_school_zone_counts = (crashes[SCHOOL_ZONE_INDICATOR] == 1).value_counts()
-        assert crashes_in_school_zone_counts[True] < crashes_in_school_zone_counts[False], 'More crashes took place in school zones than outside, this was not expected'
+        :param field: Database Field Name of the field in the decode sheets
+        :param record_type: record type of the field
+        :return: categorical Series of labels, aligned with the table of the record type
+        :raises ValueError: when the field has no code set
+        """
+        key = (record_type, field)
+        if key not in self._decoded:
+            code_sets = read_code_sets()
+            if key not in code_sets:
+                raise ValueError('No code set for the {} field {}'.format(record_type.name, field))
+            values = self._tables[record_type][get_field_column(record_type, field)]
+            self._decoded[key] = decode(values, code_sets[key])
+        return self._decoded[key]
+
+    def derived(self, name):
+        """
+        Column derived from the crash data, e.g. derived(CRASH_DATE), computed on first use and memoized. The
+        columns read by the validation rules are memoized as the workers loading the files compute them.
 
-        # every crash participant has a Crash ID of a known crash
-        participants = self._df[self._df[RECORD_TYPE] == CrashRecordType.PARTICIPANT]
-        assert set(participants[CRASH_ID]) == set(crashes[CRASH_ID]), "Expected all participants to have crash IDs of known crashes"
+        :param name: name of a derived column, see CrashDerivedColumns
+        :return: Series aligned with the table of the column's record type
+        :raises ValueError: when there is no derived column of that name
+        """
+        if name not in self._derived:
+            if name not in DERIVED_COLUMNS:
+                raise ValueError('No derived column {}'.format(name))
+            derived_column = DERIVED_COLUMNS[name]
+            self._derived[name] = derived_column.compute(self._tables[derived_column.record_type]).rename(name)
+        return self._derived[name]
+
+    @property
+    def spatial_index(self):
+        """
+        CrashSpatialIndex over the location of every crash, built on first use. Its queries return positions of
+        crashes, e.g. crashes.iloc[spatial_index.within_radius(45.5, -122.6, 2.0)].
+        """
+        if self._spatial_index is None:
+            self._spatial_index = CrashSpatialIndex(self.derived(LATITUDE), self.derived(LONGITUDE))
+        return self._spatial_index
 
-        # every vehicle has a crash id of known crash
-        vehicles = self._df[self._df[RECORD_TYPE] == CrashRecordType.VEHICLE]
-        assert set(vehicles[CRASH_ID]) == set(crashes[CRASH_ID]), "Expected all vehicles to have crash IDs of known crashes"
+    def get_crash_hotspots(self, radius_km=1.0, min_crashes=10):
+        """
+        Clusters of at least min_crashes crashes within radius_km of a crash, see CrashSpatialIndex.hotspots.
 
-        # Most crashes involve at-least two vehicles
-        crashes_with_at_least_2_vehicles_count = 0
-        for crash_id, crash_group in self._group_by_crash:
-            if crash_group[crash_group[RECORD_TYPE] == CrashRecordType.VEHICLE].shape[0] >= 2:
-                crashes_with_at_least_2_vehicles_count += 1
-        assert crashes_with_at_least_2_vehicles_count > (self._group_by_crash.ngroups / 2), "expected most crashes involve at-least two vehicles"
+        :return: DataFrame of the hotspots, most crashes first, with the Crash ID, latitude and longitude of the
+            center crash, the number of crashes and their Crash IDs
+        """
+        crash_ids = self.crashes[CRASH_ID].to_numpy()
+        hotspots = self.spatial_index.hotspots(radius_km, min_crashes)
+        return pd.DataFrame({
+            CRASH_ID: crash_ids[hotspots['center'].to_numpy(dtype='int64')],
+            LATITUDE: hotspots['latitude'],
+            LONGITUDE: hotspots['longitude'],
+            'Crash Count': hotspots['count'],
+            'Crash IDs': [crash_ids[positions].tolist() for positions in hotspots['positions']],
+        })
+
+    def validate_crash_data(self, raise_on_failure=True):
+        """
+        Evaluate all crash validation rules, reporting every failed rule and the Crash IDs violating it.
 
-        # Most collisions happen at an angle
-        crash_types_value_counts = crashes[COLLISION_TYPE].value_counts()
-        # Collision Type code of 1 = collision occurred at an angle
-        assert crash_types_value_counts[1] > (len(crashes) / 2), 'Expected most collisions happen at an angle'
+        :param raise_on_failure: whether to raise when any rule fails
+        :return: CrashValidationReport
+        :raises AssertionError: when raise_on_failure is set and a rule failed
+        """
+        self._logger.info("Validating crash data of {} file(s) ...".format(len(self._paths)))
 
-        self._logger.info("Validation of crash data completed successfully!")
+        report = self._validator.finish(self._aggregates)
+        return self._log_report(report, raise_on_failure)
 
-    @staticmethod
-    def _get_total_fatality_and_injury_count(crash_record):
-        count = 0
-        for fatality_type_field in FATALITY_COUNT_FIELDS.union(INJURY_COUNT_FIELDS):
-            count += crash_record[fatality_type_field]
-        return count
+    @property
+    def profile(self):
+        """
+        Records and seconds spent loading every file, and seconds spent on every validation rule, see
+        CrashValidator.get_timings. Rules are finished by validate_crash_data.
 
-    def _validate_and_get_crash_dates(self):
+        Files loaded by worker processes while memory is traced also have the peak memory their worker allocated
+        loading them; the memory of a single file, loaded in this process, is in the stage loading it.
         """
-        Validate that each crash record has a valid crash date. Crash dates should be in the past.
+        return dict(self._validator.get_timings(), files=list(self._file_profiles))
 
-        :raises RuntimeError: when an error validating crash date(s) is encountered
+    @classmethod
+    def validate_crash_file(cls, path=DATA_FILE, chunksize=CHUNK_SIZE, raise_on_failure=True, validator=None):
         """
-        try:
-            crashes = self._df[self._df[RECORD_TYPE] == CrashRecordType.CRASH]
+        Evaluate all crash validation rules over a crash data file streamed in chunks, without loading it.
+        Only the columns read by the rules are parsed. Gives the same report as validate_crash_data, see CrashValidator.validate_chunks.
+
+        :param path: crash data file
+        :param chunksize: number of records read at a time
+        :param raise_on_failure: whether to raise when any rule fails
+        :param validator: CrashValidator of the crash validation rules to validate with, e.g. to read its timings
+        :return: CrashValidationReport
+        :raises AssertionError: when raise_on_failure is set and a rule failed
+        """
+        cls._logger.info("Validating crash data of {} in chunks of {} records ...".format(path, chunksize))
+
+        validator = validator or CrashValidator(CRASH_VALIDATION_RULES)
+        with cls._load_data_as_df(path, usecols=validator.columns, chunksize=chunksize) as chunks:
+            report = validator.validate_chunks(chunks)
+        return cls._log_report(report, raise_on_failure)
 
-            # crash month, day and year for each crash level record is a valid date
-            crash_dates = pd.to_datetime(crashes[[CRASH_DAY, CRASH_MONTH, CRASH_YEAR]]
-                                         .astype(str)
-                                         .apply(func=' '.join, axis=1)
-                                         , format='%d %m %Y'
-                                         , errors='raise')
+    @classmethod
+    def _log_report(cls, report, raise_on_failure):
+        for result in report.failed_results:
+            cls._logger.error(report.format_result(result))
+        cls._logger.debug('Validation report:\n%s', report)
 
-            # every crash has a date associated with it
-            assert crashes.shape[0] == len(crash_dates), 'Expected number of crash dates [{}] to be equal to number of crashes [{}]'.format(crashes.shape[0], len(crash_dates))
+        if report.passed:
+            cls._logger.info("Validation of crash data completed successfully!")
+        else:
+            assert not raise_on_failure, 'Crash data failed validation rule(s): {}'.format(
+                ', '.join(result.name for result in report.failed_results))
 
-            # crash date is in the past, not future
-            assert all(crash_dates < pd.to_datetime(datetime.now())), 'Expected all crash dates to be in the past, found 1 or more in the future.'
+        return report
 
-            return crash_dates
-        except Exception as ex:
-            raise RuntimeError("Encountered an error while validating crash dates", ex)
+    def export_to_postgres(self, dsn, schema='public', parallel=True):
+        """
+        Replace the crash, vehicle and participant tables of a Postgres database by the crash data, see
+        CrashPostgresExporter.
+
+        :param dsn: connection string of the database
+        :param schema: schema of the tables
+        :param parallel: whether to copy the tables concurrently
+        :return: dict of the seconds spent copying every table and adding keys and indexes
+        """
+        return CrashPostgresExporter(dsn, schema).export(self._tables, parallel=parallel)
 
     def describe(self):
-        self._logger.info('Found {} crashes'.format(self._group_by_crash.ngroups))
-        self._logger.debug('Following are all crash IDs: {}'.format(list(self._group_by_crash.groups)))
+        """
+        Profile every column of the crash, vehicle and participant tables in one pass over them, see CrashDescriber.
+        The profiles are logged at DEBUG.
+
+        :return: dict of CrashRecordType to a DataFrame of the profile of every column of its table
+        """
+        describer = CrashDescriber()
+        # in chunks, the sketches' temporary arrays stay the size of a chunk
+        for start in range(0, max(len(table) for table in self._tables.values()), CHUNK_SIZE):
+            describer.update({record_type: table.iloc[start:start + CHUNK_SIZE]
+                              for record_type, table in self._tables.items()})
+        return self._log_description(describer, len(self._paths))
+
+    @classmethod
+    def describe_crash_file(cls, path=DATA_FILE, chunksize=CHUNK_SIZE):
+        """
+        Profile every column of a crash data file streamed in chunks, without loading it, see describe.
+
+        :param path: crash data file
+        :param chunksize: records read at a time
+        :return: dict of CrashRecordType to a DataFrame of the profile of every column of its table
+        """
+        describer = CrashDescriber()
+        with cls._load_data_as_df(path, chunksize=chunksize) as chunks:
+            for chunk in chunks:
+                describer.update(split_records(chunk))
+        return cls._log_description(describer, 1)
+
+    @classmethod
+    def _log_description(cls, describer, files):
+        cls._logger.info('Found {} crashes, {} vehicles and {} participants in {} file(s)'.format(
+            *(describer.get_record_count(record_type) for record_type in CrashRecordType), files))
+
+        descriptions = describer.describe()
+        for record_type, description in descriptions.items():
+            cls._logger.debug('Profile of the {} columns:\n{}'.format(record_type.name.lower(),
+                                                                      description.to_string()))
+        return descriptions
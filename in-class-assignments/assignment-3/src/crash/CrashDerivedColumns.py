@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from crash.CrashColumns import CRASH_DATE, CRASH_DAY, CRASH_MONTH, CRASH_YEAR, FATALITY_COUNT, INJURY_COUNT, \
+    LATITUDE, LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS, LONGITUDE, LONGITUDE_DEGREES, LONGITUDE_MINUTES, \
+    LONGITUDE_SECONDS, TOTAL_INJURY_FATALITY_COUNT
+from crash.CrashRecordType import CrashRecordType
+
+# a column computed from other columns of the table of a record type, by a vectorized function of that table
+DerivedColumn = namedtuple('DerivedColumn', ['name', 'record_type', 'columns', 'compute'])
+
+
+# crash date of every crash, NaT where crash month, day and year are not a valid date
+def get_crash_dates(crashes):
+    date_components = crashes[[CRASH_YEAR, CRASH_MONTH, CRASH_DAY]] \
+        .set_axis(['year', 'month', 'day'], axis=1) \
+        .astype('float64')
+    return pd.to_datetime(date_components, errors='coerce')
+
+
+# widened first, the row sum of byte counts would otherwise stay a byte
+def get_total_fatality_and_injury_count(crashes):
+    return crashes[[FATALITY_COUNT, INJURY_COUNT]].astype(pd.UInt32Dtype()).sum(axis=1)
+
+
+# decimal degrees of degrees, minutes and seconds, signed like the degrees (longitudes are negative)
+def _get_decimal_degrees(degrees_column, minutes_column, seconds_column):
+    def compute(crashes):
+        degrees = crashes[degrees_column].astype('float64')
+        minutes = crashes[minutes_column].astype('float64')
+        seconds = crashes[seconds_column].astype('float64')
+        return np.copysign(degrees.abs() + minutes / 60 + seconds / 3600, degrees)
+    return compute
+
+
+DERIVED_COLUMNS = {derived_column.name: derived_column for derived_column in [
+    DerivedColumn(CRASH_DATE, CrashRecordType.CRASH, [CRASH_YEAR, CRASH_MONTH, CRASH_DAY], get_crash_dates),
+    DerivedColumn(TOTAL_INJURY_FATALITY_COUNT, CrashRecordType.CRASH,
+                  [FATALITY_COUNT, INJURY_COUNT], get_total_fatality_and_injury_count),
+    DerivedColumn(LATITUDE, CrashRecordType.CRASH, [LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS],
+                  _get_decimal_degrees(LATITUDE_DEGREES, LATITUDE_MINUTES, LATITUDE_SECONDS)),
+    DerivedColumn(LONGITUDE, CrashRecordType.CRASH, [LONGITUDE_DEGREES, LONGITUDE_MINUTES, LONGITUDE_SECONDS],
+                  _get_decimal_degrees(LONGITUDE_DEGREES, LONGITUDE_MINUTES, LONGITUDE_SECONDS)),
+]}
+
+
+def get_source_columns(columns):
+    """
+    Columns read to compute columns, the derived ones replaced by the columns they are derived from.
+    """
+    return list(dict.fromkeys(source_column for column in columns
+                              for source_column in (DERIVED_COLUMNS[column].columns
+                                                    if column in DERIVED_COLUMNS else [column])))
+
+
+def add_derived_columns(records, columns):
+    """
+    Add the derived columns among columns that records do not hold yet, each computed once.
+
+    :param records: table of the derived columns' record type
+    :return: records with the derived columns, records itself when nothing is derived
+    """
+    missing_columns = [column for column in columns if column in DERIVED_COLUMNS and column not in records.columns]
+    if not missing_columns:
+        return records
+    return records.assign(**{column: DERIVED_COLUMNS[column].compute(records) for column in missing_columns})
@@ -0,0 +1,115 @@
+import pandas as pd
+
+from crash.CrashColumns import CRASH_ID, PARTICIPANT_ID, VEHICLE_ID
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_table_fields
+from crash.CrashSketches import HyperLogLog, TDigest, TopK
+
+# columns identifying records, described by their null rate and distinct count only
+ID_COLUMNS = {CRASH_ID, VEHICLE_ID, PARTICIPANT_ID}
+
+# quantiles of the numeric columns in descriptions, besides their min and max
+QUANTILES = [0.01, 0.25, 0.5, 0.75, 0.99]
+
+# most frequent codes of the code columns in descriptions
+TOP_K = 5
+
+
+class ColumnSketch:
+    """
+    Null count, approximate distinct count, quantiles of numbers and most frequent codes of a column, in bounded
+    memory whatever the number of values.
+    """
+
+    def __init__(self, dtype, is_id):
+        """
+        :param dtype: dtype of the column
+        :param is_id: whether the column identifies records, its values are then only counted
+        """
+        is_numeric = pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+        self.records = 0
+        self.nulls = 0
+        self.distinct = HyperLogLog()
+        self.quantiles = TDigest() if is_numeric and not is_id else None
+        self.codes = TopK() if not is_id and not pd.api.types.is_float_dtype(dtype) else None
+
+    def update(self, values):
+        present_values = values.dropna()
+        self.records += len(values)
+        self.nulls += len(values) - len(present_values)
+        for sketch in (self.distinct, self.quantiles, self.codes):
+            if sketch is not None:
+                sketch.update(present_values)
+
+    def merge(self, other):
+        self.records += other.records
+        self.nulls += other.nulls
+        for sketch, other_sketch in ((self.distinct, other.distinct), (self.quantiles, other.quantiles),
+                                     (self.codes, other.codes)):
+            if sketch is not None:
+                sketch.merge(other_sketch)
+
+    def describe(self):
+        description = {
+            'null_rate': self.nulls / self.records if self.records else float('nan'),
+            'distinct': self.distinct.estimate(),
+        }
+        if self.quantiles is not None:
+            description['min'] = self.quantiles.quantile(0)
+            description.update({'p{:g}'.format(q * 100): self.quantiles.quantile(q) for q in QUANTILES})
+            description['max'] = self.quantiles.quantile(1)
+        if self.codes is not None:
+            description['top_codes'] = self.codes.top(TOP_K)
+        return description
+
+
+class CrashDescriber:
+    """
+    Profile of every column of the crash, vehicle and participant tables, computed in one pass over chunks of
+    crash data: null rate, approximate distinct count (HyperLogLog), approximate quantiles of numbers (t-digest)
+    and most frequent codes (top-k). Memory is bounded by the number of columns, not of records.
+
+    Like CrashValidator, the describers of several chunks or files can be merged before describing.
+    """
+
+    def __init__(self):
+        self._sketches = {record_type: {} for record_type in CrashRecordType}
+
+    def update(self, tables):
+        """
+        Add a chunk of crash data.
+
+        :param tables: dict of CrashRecordType to its table, as made by split_records
+        """
+        for record_type, sketches in self._sketches.items():
+            table = tables[record_type]
+            if not len(table):
+                continue
+            for column in table.columns:
+                if column not in sketches:
+                    sketches[column] = ColumnSketch(table[column].dtype, column in ID_COLUMNS)
+                sketches[column].update(table[column])
+
+    def merge(self, other):
+        for record_type, sketches in self._sketches.items():
+            for column, other_sketch in other._sketches[record_type].items():
+                if column in sketches:
+                    sketches[column].merge(other_sketch)
+                else:
+                    sketches[column] = other_sketch
+
+    def get_record_count(self, record_type):
+        return max((sketch.records for sketch in self._sketches[record_type].values()), default=0)
+
+    def describe(self):
+        """
+        :return: dict of CrashRecordType to a DataFrame of the profile of every column of its table, indexed by
+            the decode sheet field the column holds, or by the column when it holds no field
+        """
+        descriptions = {}
+        for record_type, sketches in self._sketches.items():
+            column_fields = get_table_fields(sketches)
+            descriptions[record_type] = pd.DataFrame.from_dict(
+                {column if column_fields[column] is None else column_fields[column][1]: sketch.describe()
+                 for column, sketch in sketches.items()}, orient='index')
+        return descriptions
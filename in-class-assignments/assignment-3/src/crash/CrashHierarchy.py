@@ -0,0 +1,141 @@
+import numpy as np
+
+from crash.CrashColumns import CRASH_ID, PARTICIPANT_ID, VEHICLE_ID
+
+
+def _get_ids(table, column):
+    return table[column].to_numpy(dtype='int64', na_value=-1)
+
+
+# key of every (Crash ID, Vehicle ID) pair of both arrays, ordered like the pairs: the rank of the Crash ID among
+# all Crash IDs times the span of the Vehicle IDs, plus the Vehicle ID's offset in that span
+def _get_pair_keys(crash_ids, vehicle_ids, other_crash_ids, other_vehicle_ids):
+    all_crash_ids = np.unique(np.concatenate([crash_ids, other_crash_ids]))
+    all_vehicle_ids = np.concatenate([vehicle_ids, other_vehicle_ids])
+    if not len(all_vehicle_ids):
+        return crash_ids, other_crash_ids
+
+    min_vehicle_id = int(all_vehicle_ids.min())
+    vehicle_id_span = int(all_vehicle_ids.max()) - min_vehicle_id + 1
+    if len(all_crash_ids) * vehicle_id_span >= 2 ** 63:
+        raise OverflowError('Too many Crash IDs and Vehicle IDs to key their pairs')
+
+    def get_keys(crash_ids_of_pairs, vehicle_ids_of_pairs):
+        return np.searchsorted(all_crash_ids, crash_ids_of_pairs) * vehicle_id_span + \
+            (vehicle_ids_of_pairs - min_vehicle_id)
+    return get_keys(crash_ids, vehicle_ids), get_keys(other_crash_ids, other_vehicle_ids)
+
+
+class CrashHierarchy:
+    """
+    Index of the vehicles and participants of every crash, and of the participants of every vehicle.
+
+    Crashes are ordered by Crash ID, vehicles by Crash ID and Vehicle ID, and participants by Crash ID, Vehicle ID
+    and Participant ID. Every crash has the range of its vehicles and of its participants in these orders, and
+    every vehicle the range of its participants, so the children of a crash or vehicle are an array slice.
+    Navigation is by position in these orders; the positions of rows in their tables, e.g. for
+    vehicles.iloc[...], are given by the crash, vehicle and participant orders.
+    Participants not in a vehicle (Vehicle ID 0, e.g. pedestrians) are in the range of their crash only.
+    """
+
+    def __init__(self, crashes, vehicles, participants):
+        """
+        :param crashes: table of crash records
+        :param vehicles: table of vehicle records
+        :param participants: table of participant records
+        """
+        crash_ids = _get_ids(crashes, CRASH_ID)
+        vehicle_crash_ids, vehicle_ids = _get_ids(vehicles, CRASH_ID), _get_ids(vehicles, VEHICLE_ID)
+        participant_crash_ids = _get_ids(participants, CRASH_ID)
+        participant_vehicle_ids = _get_ids(participants, VEHICLE_ID)
+
+        self.crash_order = np.argsort(crash_ids, kind='stable')
+        self.vehicle_order = np.lexsort((vehicle_ids, vehicle_crash_ids))
+        self.participant_order = np.lexsort((_get_ids(participants, PARTICIPANT_ID), participant_vehicle_ids,
+                                             participant_crash_ids))
+
+        self.crash_ids = crash_ids[self.crash_order]
+        self.vehicle_ids = vehicle_ids[self.vehicle_order]
+        vehicle_crash_ids = vehicle_crash_ids[self.vehicle_order]
+        participant_crash_ids = participant_crash_ids[self.participant_order]
+        participant_vehicle_ids = participant_vehicle_ids[self.participant_order]
+
+        self._vehicle_starts = np.searchsorted(vehicle_crash_ids, self.crash_ids, side='left')
+        self._vehicle_ends = np.searchsorted(vehicle_crash_ids, self.crash_ids, side='right')
+        self._participant_starts = np.searchsorted(participant_crash_ids, self.crash_ids, side='left')
+        self._participant_ends = np.searchsorted(participant_crash_ids, self.crash_ids, side='right')
+
+        vehicle_keys, participant_keys = _get_pair_keys(vehicle_crash_ids, self.vehicle_ids,
+                                                        participant_crash_ids, participant_vehicle_ids)
+        self._vehicle_participant_starts = np.searchsorted(participant_keys, vehicle_keys, side='left')
+        self._vehicle_participant_ends = np.searchsorted(participant_keys, vehicle_keys, side='right')
+
+    def __len__(self):
+        return len(self.crash_ids)
+
+    def get_crash_position(self, crash_id):
+        """
+        Position of a crash in the crash order.
+
+        :raises KeyError: when there is no crash of that Crash ID
+        """
+        position = np.searchsorted(self.crash_ids, crash_id)
+        if position == len(self.crash_ids) or self.crash_ids[position] != crash_id:
+            raise KeyError(crash_id)
+        return int(position)
+
+    def get_vehicles(self, crash_position):
+        """
+        Positions of the vehicles of a crash in the vehicle order.
+        """
+        return np.arange(self._vehicle_starts[crash_position], self._vehicle_ends[crash_position])
+
+    def get_vehicle_slice(self, crash_position):
+        """
+        Slice of the vehicles of a crash in the vehicle order, e.g. of vehicles.iloc[vehicle_order].
+        """
+        return slice(int(self._vehicle_starts[crash_position]), int(self._vehicle_ends[crash_position]))
+
+    def get_participants(self, crash_position):
+        """
+        Positions of the participants of a crash in the participant order.
+        """
+        return np.arange(self._participant_starts[crash_position], self._participant_ends[crash_position])
+
+    def get_participant_slice(self, crash_position):
+        """
+        Slice of the participants of a crash in the participant order, e.g. of participants.iloc[participant_order].
+        """
+        return slice(int(self._participant_starts[crash_position]), int(self._participant_ends[crash_position]))
+
+    def get_vehicle_participants(self, vehicle_position):
+        """
+        Positions of the participants of a vehicle in the participant order.
+        """
+        return np.arange(self._vehicle_participant_starts[vehicle_position],
+                         self._vehicle_participant_ends[vehicle_position])
+
+    @property
+    def vehicle_counts(self):
+        """
+        Number of vehicles of every crash, in the crash order.
+        """
+        return self._vehicle_ends - self._vehicle_starts
+
+    @property
+    def participant_counts(self):
+        """
+        Number of participants of every crash, in the crash order.
+        """
+        return self._participant_ends - self._participant_starts
+
+    def sum_by_crash(self, participant_values):
+        """
+        Sum of a value of the participants of every crash, without grouping.
+
+        :param participant_values: array of a value of every participant, in the participant table's order
+        :return: array of the sums, in the crash order
+        """
+        values = np.asarray(participant_values)[self.participant_order]
+        sums = np.concatenate([[0], np.cumsum(values)])
+        return sums[self._participant_ends] - sums[self._participant_starts]
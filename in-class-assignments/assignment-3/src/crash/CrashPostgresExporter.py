@@ -0,0 +1,169 @@
+import io
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from crash.CrashColumns import VEHICLE_ID
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashSchema import get_table_fields
+
+# name of the table of every record type
+SQL_TABLE_NAMES = {
+    CrashRecordType.CRASH: 'crash',
+    CrashRecordType.VEHICLE: 'vehicle',
+    CrashRecordType.PARTICIPANT: 'participant',
+}
+
+# primary key, foreign keys as (column, referenced table) and indexed columns of every table, by field
+PRIMARY_KEYS = {
+    CrashRecordType.CRASH: 'CRASH_ID',
+    CrashRecordType.VEHICLE: 'VHCL_ID',
+    CrashRecordType.PARTICIPANT: 'PARTIC_ID',
+}
+FOREIGN_KEYS = {
+    CrashRecordType.CRASH: [],
+    CrashRecordType.VEHICLE: [('CRASH_ID', CrashRecordType.CRASH)],
+    CrashRecordType.PARTICIPANT: [('CRASH_ID', CrashRecordType.CRASH), ('VHCL_ID', CrashRecordType.VEHICLE)],
+}
+
+# SQL type of every dtype of the crash tables, text for the others (categories)
+SQL_TYPES = {
+    'Int8': 'SMALLINT',
+    'Int16': 'SMALLINT',
+    'UInt8': 'SMALLINT',
+    'Int32': 'INTEGER',
+    'Int64': 'BIGINT',
+    'float32': 'REAL',
+    'float64': 'DOUBLE PRECISION',
+}
+
+# records written per COPY, which bounds the memory of the CSV text whatever the size of a table
+COPY_CHUNK_SIZE = 100000
+
+
+def get_sql_columns(table):
+    """
+    Columns of the SQL table of a record type, named by their decode sheet field. Columns holding no field of the
+    decode sheets (see CrashSchema.ABSENT_COLUMNS) are not exported.
+
+    :param table: table of a record type, see CrashTables
+    :return: dict of column of the table to (SQL column, SQL type)
+    """
+    column_fields = get_table_fields(table.columns)
+    sql_columns = {}
+    for column, column_field in column_fields.items():
+        if column_field is None:
+            continue
+        field = column_field[1].lower()
+        sql_columns[column] = (field, SQL_TYPES.get(str(table[column].dtype), 'TEXT'))
+    return sql_columns
+
+
+class CrashPostgresExporter:
+    """
+    Bulk export of the crash, vehicle and participant tables into a normalized Postgres schema: one table per
+    record type keyed by its ID, vehicles and participants referencing their crash, and participants their vehicle.
+
+    Tables are (re)-created without keys or indexes and filled with COPY ... FREEZE in the transaction that creates
+    them, one connection per table and optionally in parallel. Primary keys, foreign keys and the indexes of the
+    foreign keys are added once all tables are loaded, which validates them in one pass, then the tables are
+    analyzed. Participants not in a vehicle (Vehicle ID 0, e.g. pedestrians) have a NULL vhcl_id.
+    """
+    _logger = logging.getLogger('CrashPostgresExporter')
+
+    def __init__(self, dsn, schema='public'):
+        """
+        :param dsn: connection string of the database, e.g. 'dbname=crash_db user=pkaran host=localhost'
+        :param schema: schema of the tables, created when missing
+        """
+        self._dsn = dsn
+        self._schema = schema
+
+    def _get_table_name(self, record_type):
+        return '{}.{}'.format(self._schema, SQL_TABLE_NAMES[record_type])
+
+    def export(self, tables, parallel=True):
+        """
+        Replace the crash tables of the database by the given tables.
+
+        :param tables: dict of CrashRecordType to its table, see CrashTables
+        :param parallel: whether to copy the tables concurrently, on a connection each
+        :return: dict of table name to the seconds spent copying it, and 'constraints' to the seconds spent adding
+            keys and indexes and analyzing the tables
+        :raises psycopg2.Error: e.g. when a key is not unique or references a missing record
+        """
+        sql_columns = {record_type: get_sql_columns(tables[record_type])
+                       for record_type in SQL_TABLE_NAMES}
+
+        connection = psycopg2.connect(self._dsn)
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.execute('CREATE SCHEMA IF NOT EXISTS {}'.format(self._schema))
+                cursor.execute('DROP TABLE IF EXISTS {} CASCADE'.format(
+                    ', '.join(self._get_table_name(record_type) for record_type in reversed(SQL_TABLE_NAMES))))
+
+            record_types = list(SQL_TABLE_NAMES)
+            copy_args = ([tables[record_type] for record_type in record_types], record_types,
+                         [sql_columns[record_type] for record_type in record_types])
+            if parallel:
+                with ThreadPoolExecutor(max_workers=len(record_types)) as executor:
+                    copy_seconds = list(executor.map(self._copy_table, *copy_args))
+            else:
+                copy_seconds = list(map(self._copy_table, *copy_args))
+            timings = dict(zip([SQL_TABLE_NAMES[record_type] for record_type in record_types], copy_seconds))
+
+            start = time.perf_counter()
+            with connection, connection.cursor() as cursor:
+                self._add_constraints(cursor)
+                for record_type in record_types:
+                    cursor.execute('ANALYZE {}'.format(self._get_table_name(record_type)))
+            timings['constraints'] = time.perf_counter() - start
+        finally:
+            connection.close()
+
+        self._logger.info('Exported {} to {}'.format(', '.join(
+            '{} {} records in {:.3f}s'.format(len(tables[record_type]), name, timings[name])
+            for record_type, name in SQL_TABLE_NAMES.items()), self._schema))
+        return timings
+
+    # creates and fills a table in one transaction, so COPY can write its rows already frozen
+    def _copy_table(self, table, record_type, sql_columns):
+        start = time.perf_counter()
+        table_name = self._get_table_name(record_type)
+        records = table[list(sql_columns)]
+        if record_type == CrashRecordType.PARTICIPANT:
+            records = records.assign(**{VEHICLE_ID: records[VEHICLE_ID].mask(records[VEHICLE_ID] == 0)})
+
+        connection = psycopg2.connect(self._dsn)
+        try:
+            with connection, connection.cursor() as cursor:
+                cursor.execute('CREATE TABLE {} ({})'.format(table_name, ', '.join(
+                    '{} {}'.format(name, sql_type) for name, sql_type in sql_columns.values())))
+
+                copy = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv, FREEZE)'.format(
+                    table_name, ', '.join(name for name, _ in sql_columns.values()))
+                for chunk_start in range(0, len(records), COPY_CHUNK_SIZE):
+                    csv_text = io.StringIO()
+                    records.iloc[chunk_start:chunk_start + COPY_CHUNK_SIZE].to_csv(csv_text, header=False, index=False)
+                    csv_text.seek(0)
+                    cursor.copy_expert(copy, csv_text)
+        finally:
+            connection.close()
+
+        seconds = time.perf_counter() - start
+        self._logger.debug('Copied {} records to {} in {:.3f}s'.format(len(records), table_name, seconds))
+        return seconds
+
+    def _add_constraints(self, cursor):
+        for record_type, field in PRIMARY_KEYS.items():
+            cursor.execute('ALTER TABLE {} ADD PRIMARY KEY ({})'.format(self._get_table_name(record_type),
+                                                                       field.lower()))
+        for record_type, foreign_keys in FOREIGN_KEYS.items():
+            table_name = self._get_table_name(record_type)
+            for field, referenced_record_type in foreign_keys:
+                cursor.execute('ALTER TABLE {} ADD FOREIGN KEY ({}) REFERENCES {} ({})'.format(
+                    table_name, field.lower(), self._get_table_name(referenced_record_type),
+                    PRIMARY_KEYS[referenced_record_type].lower()))
+                cursor.execute('CREATE INDEX ON {} ({})'.format(table_name, field.lower()))
@@ -0,0 +1,74 @@
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class CrashProfiler:
+    """
+    Wall time, peak traced memory and records processed of the stages of a run, summarized as JSON.
+
+    Memory is traced with tracemalloc while the profiler is started, which slows the run down. The peak of every
+    stage is the most memory allocated by Python at once during it beyond what was allocated when it started, so
+    memory kept from earlier stages is not counted again; the peak of the run is the most allocated at once.
+    """
+    _logger = logging.getLogger('CrashProfiler')
+
+    def __init__(self, trace_memory=True):
+        """
+        :param trace_memory: whether to trace memory with tracemalloc
+        """
+        self._trace_memory = trace_memory
+        self._stages = []
+        self._details = {}
+        self._start = None
+        self._peak_memory = 0
+
+    def start(self):
+        if self._trace_memory:
+            tracemalloc.start()
+        self._start = time.perf_counter()
+
+    def stop(self):
+        self._details['total_seconds'] = time.perf_counter() - self._start
+        if self._trace_memory:
+            self._details['peak_memory_bytes'] = max(self._peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Profile a stage of the run: with profiler.stage('validate') as stage: ...
+
+        :return: dict of the stage's profile, e.g. to set its 'records' processed
+        """
+        stage = {'name': name}
+        if self._trace_memory:
+            # the peak of the run so far, which resetting the peak for the stage forgets
+            self._peak_memory = max(self._peak_memory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield stage
+        finally:
+            stage['seconds'] = time.perf_counter() - start
+            if self._trace_memory:
+                stage['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - start_memory
+            self._stages.append(stage)
+            self._logger.info('Stage {} took {:.3f}s'.format(name, stage['seconds']))
+
+    def add_details(self, **details):
+        """
+        Add details to the summary, e.g. the timings of the validation rules.
+        """
+        self._details.update(details)
+
+    def to_dict(self):
+        return dict(self._details, stages=self._stages)
+
+    def write_json(self, path):
+        with open(path, mode='w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        self._logger.info('Wrote profile summary to {}'.format(path))
@@ -0,0 +1,323 @@
+import os
+
+import pandas as pd
+
+from crash.CrashRecordType import CrashRecordType
+from definitions import DATA_DIR
+
+# decode sheet of the fields of every record type, with the Database Field Name, Type, Len and Format of each field
+DECODE_FILES = {
+    CrashRecordType.CRASH: 'DataFieldsAndFormats.xlsx - decode_crash.csv',
+    CrashRecordType.VEHICLE: 'DataFieldsAndFormats.xlsx - decode_vehicle.csv',
+    CrashRecordType.PARTICIPANT: 'DataFieldsAndFormats.xlsx - decode_participant.csv',
+}
+
+# the decode sheet field of every column of the extract's header
+COLUMN_FIELDS = {
+    'Crash ID': (CrashRecordType.CRASH, 'CRASH_ID'),
+    'Record Type': None,
+    'Vehicle ID': (CrashRecordType.VEHICLE, 'VHCL_ID'),
+    'Participant ID': (CrashRecordType.PARTICIPANT, 'PARTIC_ID'),
+    'Participant Display Seq#': (CrashRecordType.PARTICIPANT, 'PARTIC_DSPLY_SEQ_NO'),
+    'Vehicle Coded Seq#': (CrashRecordType.VEHICLE, 'VHCL_CODED_SEQ_NO'),
+    'Participant Vehicle Seq#': (CrashRecordType.PARTICIPANT, 'PARTIC_VHCL_SEQ_NO'),
+    'Serial #': (CrashRecordType.CRASH, 'SER_NO'),
+    'Crash Month': (CrashRecordType.CRASH, 'CRASH_MO_NO'),
+    'Crash Day': (CrashRecordType.CRASH, 'CRASH_DAY_NO'),
+    'Crash Year': (CrashRecordType.CRASH, 'CRASH_YR_NO'),
+    'Week Day Code': (CrashRecordType.CRASH, 'CRASH_WK_DAY_CD'),
+    'Crash Hour': (CrashRecordType.CRASH, 'CRASH_HR_NO'),
+    'County Code': (CrashRecordType.CRASH, 'CNTY_ID'),
+    'City Section ID': (CrashRecordType.CRASH, 'CITY_SECT_ID'),
+    'Urban Area Code': (CrashRecordType.CRASH, 'URB_AREA_CD'),
+    'Functional Class Code': (CrashRecordType.CRASH, 'FC_CD'),
+    'NHS Flag': (CrashRecordType.CRASH, 'NHS_FLG'),
+    'Highway Number': (CrashRecordType.CRASH, 'HWY_NO'),
+    'Highway Suffix': (CrashRecordType.CRASH, 'HWY_SFX_NO'),
+    'Roadway Number': (CrashRecordType.CRASH, 'RDWY_NO'),
+    'Highway Component': (CrashRecordType.CRASH, 'HWY_COMPNT_CD'),
+    'Mileage Type': (CrashRecordType.CRASH, 'MLGE_TYP_CD'),
+    'Connection Number': (CrashRecordType.CRASH, 'RD_CON_NO'),
+    'Linear Reference System (LRS)': (CrashRecordType.CRASH, 'LRS_VAL'),
+    'Latitude Degrees': (CrashRecordType.CRASH, 'LAT_DEG_NO'),
+    'Latitude Minutes': (CrashRecordType.CRASH, 'LAT_MINUTE_NO'),
+    'Latitude Seconds': (CrashRecordType.CRASH, 'LAT_SEC_NO'),
+    'Longitude Degrees': (CrashRecordType.CRASH, 'LONGTD_DEG_NO'),
+    'Longitude Minutes': (CrashRecordType.CRASH, 'LONGTD_MINUTE_NO'),
+    'Longitude Seconds': (CrashRecordType.CRASH, 'LONGTD_SEC_NO'),
+    'Latitude (Decimal Degrees)': (CrashRecordType.CRASH, 'LAT_DD'),
+    'Longitude (Decimal Degrees)': (CrashRecordType.CRASH, 'LONGTD_DD'),
+    'Special Jurisdiction': (CrashRecordType.CRASH, 'SPECL_JRSDCT_ID'),
+    'Jurisdiction Group': (CrashRecordType.CRASH, 'JRSDCT_GRP_CD'),
+    'Street Number': (CrashRecordType.CRASH, 'AGY_ST_NO'),
+    'Nearest Intersecting Street Number': (CrashRecordType.CRASH, 'ISECT_AGY_ST_NO'),
+    'Intersection Sequence Number': (CrashRecordType.CRASH, 'ISECT_SEQ_NO'),
+    'Distance from Intersection': (CrashRecordType.CRASH, 'FROM_ISECT_DSTNC_QTY'),
+    'Direction From Intersection': (CrashRecordType.CRASH, 'CMPSS_DIR_CD'),
+    'Milepoint': (CrashRecordType.CRASH, 'MP_NO'),
+    'Posted Speed Limit': (CrashRecordType.CRASH, 'POST_SPEED_LMT_VAL'),
+    'Road Character': (CrashRecordType.CRASH, 'RD_CHAR_CD'),
+    'Off Roadway Flag': (CrashRecordType.CRASH, 'OFF_RDWY_FLG'),
+    'Intersection Type': (CrashRecordType.CRASH, 'ISECT_TYP_CD'),
+    'Intersection Related Flag': (CrashRecordType.CRASH, 'ISECT_REL_FLG'),
+    'Roundabout Flag': (CrashRecordType.CRASH, 'RNDABT_FLG'),
+    'Driveway Related Flag': (CrashRecordType.CRASH, 'DRVWY_REL_FLG'),
+    'Number of Lanes': (CrashRecordType.CRASH, 'LN_QTY'),
+    'Number of Turning Legs': (CrashRecordType.CRASH, 'TURNG_LEG_QTY'),
+    'Median Type': (CrashRecordType.CRASH, 'MEDN_TYP_CD'),
+    'Impact Location': (CrashRecordType.CRASH, 'IMPCT_LOC_CD'),
+    'Crash Type': (CrashRecordType.CRASH, 'CRASH_TYP_CD'),
+    'Collision Type': (CrashRecordType.CRASH, 'COLLIS_TYP_CD'),
+    'Crash Severity': (CrashRecordType.CRASH, 'CRASH_SVRTY_CD'),
+    'Weather Condition': (CrashRecordType.CRASH, 'WTHR_COND_CD'),
+    'Road Surface Condition': (CrashRecordType.CRASH, 'RD_SURF_COND_CD'),
+    'Light Condition': (CrashRecordType.CRASH, 'LGT_COND_CD'),
+    'Traffic Control Device (TCD)': (CrashRecordType.CRASH, 'TRAF_CNTL_DEVICE_CD'),
+    'TCD Functional Flag': (CrashRecordType.CRASH, 'TRAF_CNTL_FUNC_FLG'),
+    'Investigating Agency': (CrashRecordType.CRASH, 'INVSTG_AGY_CD'),
+    'Crash Level Event 1 Code': (CrashRecordType.CRASH, 'CRASH_EVNT_1_CD'),
+    'Crash Level Event 2 Code': (CrashRecordType.CRASH, 'CRASH_EVNT_2_CD'),
+    'Crash Level Event 3 Code': (CrashRecordType.CRASH, 'CRASH_EVNT_3_CD'),
+    'Crash Level Cause 1 Code': (CrashRecordType.CRASH, 'CRASH_CAUSE_1_CD'),
+    'Crash Level Cause 2 Code': (CrashRecordType.CRASH, 'CRASH_CAUSE_2_CD'),
+    'Crash Level Cause 3 Code': (CrashRecordType.CRASH, 'CRASH_CAUSE_3_CD'),
+    'School Zone Indicator': (CrashRecordType.CRASH, 'SCHL_ZONE_IND'),
+    'Work Zone Indicator': (CrashRecordType.CRASH, 'WRK_ZONE_IND'),
+    'Secondary Crash Indicator': None,
+    'Alcohol-Involved Flag': (CrashRecordType.CRASH, 'ALCHL_INVLV_FLG'),
+    'Drugs Involved Flag': (CrashRecordType.CRASH, 'DRUG_INVLV_FLG'),
+    'Crash Marijuana Involved Flag': (CrashRecordType.CRASH, 'MJ_INVLV_FLG'),
+    'Speed Involved Flag': (CrashRecordType.CRASH, 'CRASH_SPEED_INVLV_FLG'),
+    'Crash Level Hit & Run Flag': (CrashRecordType.CRASH, 'CRASH_HIT_RUN_FLG'),
+    'Population Range Code': (CrashRecordType.CRASH, 'POP_RNG_CD'),
+    'Road Control': (CrashRecordType.CRASH, 'RD_CNTL_CD'),
+    'Route Type': (CrashRecordType.CRASH, 'RTE_TYP_CD'),
+    'Route Number': (CrashRecordType.CRASH, 'RTE_ID'),
+    'Region ID': (CrashRecordType.CRASH, 'REG_ID'),
+    'District ID': (CrashRecordType.CRASH, 'DIST_ID'),
+    'Segment Marker ID': (CrashRecordType.CRASH, 'SEG_MRK_ID'),
+    'Segment Point LRS Measure': (CrashRecordType.CRASH, 'SEG_PT_LRS_MEAS'),
+    'Unlocatable Flag': (CrashRecordType.CRASH, 'UNLOCT_FLG'),
+    'Total Vehicle Count': (CrashRecordType.CRASH, 'TOT_VHCL_CNT'),
+    'Total Fatality Count': (CrashRecordType.CRASH, 'TOT_FATAL_CNT'),
+    'Total Suspected Serious Injury (A) Count': (CrashRecordType.CRASH, 'TOT_INJ_LVL_A_CNT'),
+    'Total Suspected Minor Injury (B) Count': (CrashRecordType.CRASH, 'TOT_INJ_LVL_B_CNT'),
+    'Total Possible Injury (C) Count': (CrashRecordType.CRASH, 'TOT_INJ_LVL_C_CNT'),
+    'Total Non-Fatal Injury Count': (CrashRecordType.CRASH, 'TOT_INJ_CNT'),
+    'Total Un-Injured  Children Age 00-04': (CrashRecordType.CRASH, 'TOT_UNINJD_AGE00_04_CNT'),
+    'Total Un-Injured Persons': (CrashRecordType.CRASH, 'TOT_UNINJD_PER_CNT'),
+    'Total Pedestrian Count': (CrashRecordType.CRASH, 'TOT_PED_CNT'),
+    'Total Pedestrian Fatality Count': (CrashRecordType.CRASH, 'TOT_PED_FATAL_CNT'),
+    'Total Pedestrian Non-Fatal Injury Count': (CrashRecordType.CRASH, 'TOT_PED_INJ_CNT'),
+    'Total Pedalcyclist Count': (CrashRecordType.CRASH, 'TOT_PEDCYCL_CNT'),
+    'Total Pedalcyclist Fatality Count': (CrashRecordType.CRASH, 'TOT_PEDCYCL_FATAL_CNT'),
+    'Total Pedalcyclist Non-Fatal Injury Count': (CrashRecordType.CRASH, 'TOT_PEDCYCL_INJ_CNT'),
+    'Total Unknown Non-Motorist Count': (CrashRecordType.CRASH, 'TOT_UNKNWN_CNT'),
+    'Total Unknown Non-Motorist Fatality Count': (CrashRecordType.CRASH, 'TOT_UNKNWN_FATAL_CNT'),
+    'Total Unknown Non-Motorist Injury Count': (CrashRecordType.CRASH, 'TOT_UNKNWN_INJ_CNT'),
+    'Total Vehicle Occupant Count': (CrashRecordType.CRASH, 'TOT_OCCUP_CNT'),
+    'Total Count of Persons Involved': (CrashRecordType.CRASH, 'TOT_PER_INVLV_CNT'),
+    'Total Persons Using Safety Equipment  ': (CrashRecordType.CRASH, 'TOT_SFTY_EQUIP_USED_QTY'),
+    'Total Persons Not Using Safety Equipment': (CrashRecordType.CRASH, 'TOT_SFTY_EQUIP_UNUSED_QTY'),
+    'Total Persons Safety Equipment Use Unknown': (CrashRecordType.CRASH, 'TOT_SFTY_EQUIP_USE_UNKNOWN_QTY'),
+    'Vehicle Ownership Code': (CrashRecordType.VEHICLE, 'VHCL_OWNSHP_CD'),
+    'Vehicle Special Use Code': (CrashRecordType.VEHICLE, 'VHCL_USE_CD'),
+    'Vehicle Type Code': (CrashRecordType.VEHICLE, 'VHCL_TYP_CD'),
+    'Emergency Use Flag': (CrashRecordType.VEHICLE, 'EMRGCY_VHCL_USE_FLG'),
+    'Number of Trailers': (CrashRecordType.VEHICLE, 'TRLR_QTY'),
+    'Vehicle Movement Code': (CrashRecordType.VEHICLE, 'MVMNT_CD'),
+    'Vehicle Travel Direction From': (CrashRecordType.VEHICLE, 'CMPSS_DIR_FROM_CD'),
+    'Vehicle Travel Direction To': (CrashRecordType.VEHICLE, 'CMPSS_DIR_TO_CD'),
+    'Vehicle Action Code': (CrashRecordType.VEHICLE, 'ACTN_CD'),
+    'Vehicle Cause 1 Code': (CrashRecordType.VEHICLE, 'VHCL_CAUSE_1_CD'),
+    'Vehicle Cause 2 Code': (CrashRecordType.VEHICLE, 'VHCL_CAUSE_2_CD'),
+    'Vehicle Cause 3 Code': (CrashRecordType.VEHICLE, 'VHCL_CAUSE_3_CD'),
+    'Vehicle Event 1 Code': (CrashRecordType.VEHICLE, 'VHCL_EVNT_1_CD'),
+    'Vehicle Event 2 Code': (CrashRecordType.VEHICLE, 'VHCL_EVNT_2_CD'),
+    'Vehicle Event 3 Code': (CrashRecordType.VEHICLE, 'VHCL_EVNT_3_CD'),
+    'Vehicle Exceeded Posted Speed Flag': (CrashRecordType.VEHICLE, 'VHCL_SPEED_FLG'),
+    'Vehicle Hit & Run Flag': (CrashRecordType.VEHICLE, 'VHCL_HIT_RUN_FLG'),
+    'Safety Equipment Used Quantity': (CrashRecordType.VEHICLE, 'VHCL_SFTY_EQUIP_USED_QTY'),
+    'Safety Equipment Un-used Quantity': (CrashRecordType.VEHICLE, 'VHCL_SFTY_EQUIP_UNUSED_QTY'),
+    'Safety Equipment Use Unknown Quantity': (CrashRecordType.VEHICLE, 'VHCL_SFTY_EQUIP_USE_UNKNWN_QTY'),
+    'Vehicle Occupant Count': (CrashRecordType.VEHICLE, 'VHCL_OCCUP_CNT'),
+    'Vehicle Striking Flag': (CrashRecordType.VEHICLE, 'STRIKG_VHCL_FLG'),
+    'Participant Type Code': (CrashRecordType.PARTICIPANT, 'PARTIC_TYP_CD'),
+    'Participant Hit & Run Flag': (CrashRecordType.PARTICIPANT, 'PARTIC_HIT_RUN_FLG'),
+    'Public Employee Flag': (CrashRecordType.PARTICIPANT, 'PUB_EMPL_FLG'),
+    'Sex': (CrashRecordType.PARTICIPANT, 'SEX_CD'),
+    'Age': (CrashRecordType.PARTICIPANT, 'AGE_VAL'),
+    'Driver License Status': (CrashRecordType.PARTICIPANT, 'DRVR_LIC_STAT_CD'),
+    'Driver Residence Status': (CrashRecordType.PARTICIPANT, 'DRVR_RES_STAT_CD'),
+    'Injury Severity': (CrashRecordType.PARTICIPANT, 'INJ_SVRTY_CD'),
+    'Participant Safety Equipment Use Code': (CrashRecordType.PARTICIPANT, 'SFTY_EQUIP_USE_CD'),
+    'Airbag Deployment': (CrashRecordType.PARTICIPANT, 'AIRBAG_DEPLOY_IND'),
+    'Non-Motorist Movement Code': (CrashRecordType.PARTICIPANT, 'MVMNT_CD'),
+    'Non-Motorist Travel Direction From': (CrashRecordType.PARTICIPANT, 'CMPSS_DIR_FROM_CD'),
+    'Non-Motorist Travel Direction To': (CrashRecordType.PARTICIPANT, 'CMPSS_DIR_TO_CD'),
+    'Non-Motorist Location': (CrashRecordType.PARTICIPANT, 'NON_MOTRST_LOC_CD'),
+    'Participant Action': (CrashRecordType.PARTICIPANT, 'ACTN_CD'),
+    'Participant Error 1 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_ERR_1_CD'),
+    'Participant Error 2 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_ERR_2_CD'),
+    'Participant Error 3 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_ERR_3_CD'),
+    'Participant Cause 1 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_CAUSE_1_CD'),
+    'Participant Cause 2 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_CAUSE_2_CD'),
+    'Participant Cause 3 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_CAUSE_3_CD'),
+    'Participant Event 1 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_EVNT_1_CD'),
+    'Participant Event 2 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_EVNT_2_CD'),
+    'Participant Event 3 Code': (CrashRecordType.PARTICIPANT, 'PARTIC_EVNT_3_CD'),
+    'BAC Test Results Code': (CrashRecordType.PARTICIPANT, 'BAC_VAL'),
+    'Alcohol Use Reported': (CrashRecordType.PARTICIPANT, 'ALCHL_USE_RPT_IND'),
+    'Drug Use Reported': (CrashRecordType.PARTICIPANT, 'DRUG_USE_RPT_IND'),
+    'Participant Marijuana Use Reported': (CrashRecordType.PARTICIPANT, 'MJ_USE_RPT_IND'),
+    'Participant Striker Flag': (CrashRecordType.PARTICIPANT, 'STRIKG_PARTIC_FLG'),
+}
+
+# columns of the extract's header that have no values in its records. Every value after them is written
+# under the header of the column that follows it by as many columns as absent columns precede it, e.g.
+# the values of 'Speed Involved Flag' and later columns sit under the column four to the left of it.
+ABSENT_COLUMNS = [
+    'Latitude (Decimal Degrees)',
+    'Longitude (Decimal Degrees)',
+    'Speed Involved Flag',
+    'Crash Level Hit & Run Flag',
+]
+
+# dtype of the columns not described by the decode sheets, and of the columns left empty by the absent ones
+RECORD_TYPE_DTYPE = pd.Int8Dtype()
+UNDESCRIBED_DTYPE = pd.Int8Dtype()
+
+# fields whose values do not match the Type and Format the decode sheets give them
+FIELD_DTYPES = {
+    'FROM_ISECT_DSTNC_QTY': 'float32',  # Format 6, but a distance in fractions of a mile
+}
+
+# Char fields with codes other than numbers
+ALPHANUMERIC_CODE_FIELDS = {'CRASH_TYP_CD', 'COLLIS_TYP_CD', 'IMPCT_LOC_CD', 'RD_CNTL_CD', 'RTE_TYP_CD', 'DIST_ID'}
+
+# longest Char field read as a number, longer ones are text such as names and street numbers
+MAX_CODE_LENGTH = 5
+
+
+def read_decode_sheet(record_type):
+    """
+    Read the decode sheet of a record type.
+
+    :return: DataFrame indexed by Database Field Name, with the Type, Len and Format of every field
+    """
+    decode_sheet = pd.read_csv(os.path.join(DATA_DIR, DECODE_FILES[record_type]), dtype=str)
+    if 'Format' not in decode_sheet.columns:
+        decode_sheet['Format'] = None
+    return decode_sheet.drop_duplicates('Database Field Name').set_index('Database Field Name')
+
+
+def _get_int_dtype(digits):
+    if digits <= 2:
+        return pd.Int8Dtype()
+    if digits <= 4:
+        return pd.Int16Dtype()
+    if digits <= 9:
+        return pd.Int32Dtype()
+    return pd.Int64Dtype()
+
+
+def get_field_dtype(field, field_type, length, field_format):
+    """
+    dtype of a decode sheet field, from its Type, Len and Format.
+
+    Counts become UInt8, IDs Int64, flags and coded fields the smallest nullable integer holding their number
+    of digits, alphanumeric codes and longer text become categories, and measures float32.
+    """
+    if field in FIELD_DTYPES:
+        return FIELD_DTYPES[field]
+
+    field_type = str(field_type).strip()
+    length = str(length).strip()
+    field_format = str(field_format).strip()
+
+    if field_type in ('Yes/No', 'Y/N'):
+        return pd.Int8Dtype()
+    if field_type == 'Int':
+        return pd.Int16Dtype()
+    if field_type == 'Char':
+        if field in ALPHANUMERIC_CODE_FIELDS or not length.isdigit() or int(length) > MAX_CODE_LENGTH:
+            return 'category'
+        return _get_int_dtype(int(length))
+
+    if field_format == 'byte':
+        return pd.UInt8Dtype()
+    if field_format.isdigit():
+        return _get_int_dtype(int(field_format))
+
+    # the vehicle and participant sheets give no Format, their numbers are typed by the kind of field
+    if field.endswith('_ID'):
+        return pd.Int64Dtype()
+    if field.endswith(('_CNT', '_QTY')):
+        return pd.UInt8Dtype()
+    if field.endswith('_FLG'):
+        return pd.Int8Dtype()
+    if field.endswith('_SEQ_NO') and length.isdigit():
+        return _get_int_dtype(int(length))
+    return 'float32'
+
+
+def get_column_fields(columns):
+    """
+    Decode sheet field of the values under every column of an extract.
+
+    :param columns: header of the extract
+    :return: dict of column to (CrashRecordType, Database Field Name), None for columns without a field
+    """
+    present_columns = [column for column in columns if column not in ABSENT_COLUMNS]
+    column_fields = {column: None for column in columns}
+    for column, present_column in zip(columns, present_columns):
+        column_fields[column] = COLUMN_FIELDS.get(present_column)
+    return column_fields
+
+
+def get_table_fields(table_columns, columns=tuple(COLUMN_FIELDS)):
+    """
+    Decode sheet field of the values under every column of a table holding some columns of an extract, e.g. the
+    table of a record type. Unlike get_column_fields of the table's columns, the shift of the header is that of
+    the whole extract.
+
+    :param table_columns: columns of the table
+    :param columns: header of the extract
+    :return: dict of column to (CrashRecordType, Database Field Name), None for columns without a field
+    """
+    column_fields = get_column_fields(list(columns))
+    return {column: column_fields.get(column) for column in table_columns}
+
+
+def get_field_column(record_type, field, columns=tuple(COLUMN_FIELDS)):
+    """
+    Column of an extract holding the values of a decode sheet field.
+
+    :param columns: header of the extract
+    :raises ValueError: when no column holds the field
+    """
+    for column, column_field in get_column_fields(list(columns)).items():
+        if column_field == (record_type, field):
+            return column
+    raise ValueError('No column holds the {} field {}'.format(record_type.name, field))
+
+
+def get_dtypes(columns):
+    """
+    Build the dtype of every column of an extract from the decode sheets.
+
+    :param columns: header of the extract
+    :return: dict of column to dtype, for pd.read_csv
+    """
+    decode_sheets = {record_type: read_decode_sheet(record_type) for record_type in CrashRecordType}
+
+    dtypes = {}
+    for column, column_field in get_column_fields(columns).items():
+        if column_field is None:
+            dtypes[column] = UNDESCRIBED_DTYPE
+        else:
+            record_type, field = column_field
+            decode = decode_sheets[record_type].loc[field]
+            dtypes[column] = get_field_dtype(field, decode['Type'], decode['Len'], decode['Format'])
+    dtypes['Record Type'] = RECORD_TYPE_DTYPE
+    return dtypes
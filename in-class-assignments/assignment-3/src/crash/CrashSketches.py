@@ -0,0 +1,170 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# registers of a HyperLogLog are 2 ** precision bytes, its relative error about 1.04 / sqrt(2 ** precision)
+HLL_PRECISION = 14
+
+# a t-digest keeps at most about compression / 2 centroids
+TDIGEST_COMPRESSION = 200
+
+# distinct values a top-k sketch counts, beyond which the least frequent are dropped
+TOP_K_CAPACITY = 100
+
+
+# 64 bit hash of every value, equal values of different chunks hash alike whatever their dtype's categories
+def _hash_values(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+# number of bits of every unsigned 64 bit integer, 0 for 0; frexp is exact on both 32 bit halves
+def _bit_lengths(values):
+    high, low = (values >> np.uint64(32)).astype('float64'), (values & np.uint64(0xFFFFFFFF)).astype('float64')
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1])
+
+
+class HyperLogLog:
+    """
+    Approximate number of distinct values, in 2 ** precision bytes whatever the number of values.
+
+    Every value is hashed; the first precision bits of the hash pick a register, which keeps the most leading
+    zeros plus one seen in the remaining bits. Sketches of different chunks merge by their registers' maximum.
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self._precision = precision
+        self._registers = np.zeros(2 ** precision, dtype=np.uint8)
+
+    def update(self, values):
+        """
+        :param values: Series of values, without nulls
+        """
+        if not len(values):
+            return
+        hashes = _hash_values(values)
+        registers = (hashes >> np.uint64(64 - self._precision)).astype(np.int64)
+        remaining_bits = hashes << np.uint64(self._precision)
+        ranks = np.minimum(64 - _bit_lengths(remaining_bits) + 1, 64 - self._precision + 1).astype(np.uint8)
+        np.maximum.at(self._registers, registers, ranks)
+
+    def merge(self, other):
+        self._registers = np.maximum(self._registers, other._registers)
+
+    def estimate(self):
+        count = len(self._registers)
+        alpha = 0.7213 / (1 + 1.079 / count)
+        estimate = alpha * count ** 2 / np.sum(np.ldexp(1.0, -self._registers.astype(np.int64)))
+
+        # linear counting of the empty registers is more accurate for few values
+        empty = int(np.count_nonzero(self._registers == 0))
+        if estimate <= 2.5 * count and empty:
+            estimate = count * math.log(count / empty)
+        return int(round(estimate))
+
+
+class TDigest:
+    """
+    Approximate quantiles of numbers, from at most about compression / 2 weighted centroids.
+
+    A chunk of numbers is sorted with the centroids and cut into new centroids where the arcsine scale of their
+    cumulative weight crosses an integer, so centroids are small near the extremes and large near the median;
+    quantiles interpolate between the centroids. Digests of different chunks merge by their centroids.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION):
+        self._compression = compression
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._min = math.inf
+        self._max = -math.inf
+
+    def update(self, values):
+        """
+        :param values: Series of numbers, without nulls
+        """
+        values = np.asarray(values, dtype='float64')
+        if len(values):
+            self._min = min(self._min, values.min())
+            self._max = max(self._max, values.max())
+            self._compress(np.concatenate([self._means, values]),
+                           np.concatenate([self._weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        self._min = min(self._min, other._min)
+        self._max = max(self._max, other._max)
+        self._compress(np.concatenate([self._means, other._means]),
+                       np.concatenate([self._weights, other._weights]))
+
+    def _compress(self, means, weights):
+        if not len(means):
+            return
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative_weights = np.cumsum(weights)
+        quantiles = (cumulative_weights - weights) / cumulative_weights[-1]
+        clusters = np.floor(self._compression / (2 * math.pi) * np.arcsin(2 * quantiles - 1)).astype(np.int64)
+        clusters -= clusters[0]
+
+        self._weights = np.bincount(clusters, weights=weights)
+        self._means = np.bincount(clusters, weights=means * weights)[self._weights > 0] / \
+            self._weights[self._weights > 0]
+        self._weights = self._weights[self._weights > 0]
+
+    @property
+    def count(self):
+        return int(self._weights.sum())
+
+    def quantile(self, q):
+        """
+        :param q: quantile, from 0 to 1
+        :return: approximate value of the quantile, NaN without numbers
+        """
+        if not len(self._weights):
+            return math.nan
+        centers = np.cumsum(self._weights) - self._weights / 2
+        return float(np.interp(q * self._weights.sum(), np.concatenate([[0], centers, [self._weights.sum()]]),
+                               np.concatenate([[self._min], self._means, [self._max]])))
+
+
+class TopK:
+    """
+    Most frequent values and their counts, keeping the counts of at most capacity distinct values.
+
+    Counts are exact while there are no more distinct values than capacity. Beyond it the least frequent
+    values are dropped after every chunk, and a count may be short by at most max_error, the sum of the largest
+    count dropped after every chunk.
+    """
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self._capacity = capacity
+        self._counts = pd.Series(dtype='int64')
+        self.max_error = 0
+
+    def update(self, values):
+        """
+        :param values: Series of values, without nulls
+        """
+        self._add(pd.Series(values).value_counts(sort=False))
+
+    def merge(self, other):
+        self._add(other._counts)
+        self.max_error += other.max_error
+
+    def _add(self, counts):
+        if not len(counts):
+            return
+        counts = counts.set_axis(counts.index.astype(object))
+        counts = self._counts.add(counts, fill_value=0).astype('int64') if len(self._counts) else counts.astype('int64')
+        if len(counts) > self._capacity:
+            counts = counts.sort_values(ascending=False, kind='stable')
+            self.max_error += int(counts.iloc[self._capacity])
+            counts = counts.iloc[:self._capacity]
+        self._counts = counts
+
+    def top(self, k):
+        """
+        :return: list of the k most frequent (value, count), most frequent first
+        """
+        counts = self._counts.sort_values(ascending=False, kind='stable').iloc[:k]
+        return list(zip(counts.index, counts.tolist()))
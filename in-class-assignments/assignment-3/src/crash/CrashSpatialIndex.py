@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+
+# side of the grid cells, in km
+CELL_SIZE_KM = 0.5
+
+# distances computed at once when counting the locations within a radius of every location
+MAX_DISTANCES = 1 << 22
+
+
+def get_distances_km(latitude, longitude, latitudes, longitudes):
+    """
+    Great-circle (haversine) distance from a location to every location of the arrays.
+    """
+    latitude, longitude, latitudes, longitudes = map(np.radians, (latitude, longitude, latitudes, longitudes))
+    a = np.sin((latitudes - latitude) / 2) ** 2 + \
+        np.cos(latitude) * np.cos(latitudes) * np.sin((longitudes - longitude) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class CrashSpatialIndex:
+    """
+    Uniform grid over crash locations for radius, bounding box and nearest-k queries.
+
+    Locations are bucketed into cells of about CELL_SIZE_KM on a side and stored sorted by cell, with the sorted
+    ids of the occupied cells and the offset of every one's first location, so the locations of a row of cells are
+    one contiguous slice found by binary search. Memory grows with the locations, not with the area of their
+    bounding box, which a single outlying location, e.g. at (0, 0), stretches across the globe. A query reads
+    the slices of the cells it overlaps and measures exact distances only for the locations in them.
+    Queries return positions of the locations as given, e.g. to select crashes with crashes.iloc[positions];
+    locations without coordinates are not indexed.
+    """
+
+    def __init__(self, latitudes, longitudes, cell_size_km=CELL_SIZE_KM):
+        """
+        :param latitudes: decimal degrees latitude of every location
+        :param longitudes: decimal degrees longitude of every location
+        :param cell_size_km: side of the grid cells, in km
+        """
+        latitudes = np.asarray(latitudes, dtype='float64')
+        longitudes = np.asarray(longitudes, dtype='float64')
+        positions = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+
+        self._count = len(latitudes)
+        self._cell_size_km = cell_size_km
+        if len(positions):
+            self._min_latitude, self._min_longitude = latitudes[positions].min(), longitudes[positions].min()
+            max_latitude, max_longitude = latitudes[positions].max(), longitudes[positions].max()
+        else:
+            self._min_latitude = self._min_longitude = max_latitude = max_longitude = 0.0
+
+        # cells are narrowest in degrees of longitude where the indexed locations are farthest from the equator
+        self._cell_latitude = cell_size_km / KM_PER_DEGREE
+        self._cell_longitude = cell_size_km / (KM_PER_DEGREE * math.cos(math.radians(
+            min(max(abs(self._min_latitude), abs(max_latitude)), 89.0))))
+        self._rows = int((max_longitude - self._min_longitude) // self._cell_longitude) + 1
+        self._columns = int((max_latitude - self._min_latitude) // self._cell_latitude) + 1
+
+        cells = self._get_row(longitudes[positions]) * self._columns + self._get_column(latitudes[positions])
+        order = np.argsort(cells, kind='stable')
+        self._positions = positions[order]
+        self._indexes = np.full(self._count, -1, dtype=np.int64)  # index into the sorted locations by position
+        self._indexes[self._positions] = np.arange(len(self._positions))
+        self._latitudes = latitudes[self._positions]
+        self._longitudes = longitudes[self._positions]
+        self._cells, cell_counts = np.unique(cells, return_counts=True)
+        self._cell_offsets = np.concatenate([[0], np.cumsum(cell_counts)])
+
+    def __len__(self):
+        return len(self._positions)
+
+    # index into the sorted locations of the first location of every cell at or after the given cells
+    def _get_offsets(self, cells):
+        return self._cell_offsets[np.searchsorted(self._cells, cells)]
+
+    def _get_row(self, longitudes):
+        return np.clip((longitudes - self._min_longitude) // self._cell_longitude, 0, self._rows - 1).astype(np.int64)
+
+    def _get_column(self, latitudes):
+        return np.clip((latitudes - self._min_latitude) // self._cell_latitude, 0, self._columns - 1).astype(np.int64)
+
+    # indexes into the sorted locations of every location in the cells overlapping a bounding box
+    def _get_candidates(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        if not len(self._positions) or max_latitude < self._min_latitude or max_longitude < self._min_longitude:
+            return np.empty(0, dtype=np.int64)
+        first_row, last_row = self._get_row(np.array([min_longitude, max_longitude]))
+        first_column, last_column = self._get_column(np.array([min_latitude, max_latitude]))
+
+        rows = np.arange(first_row, last_row + 1)
+        starts = self._get_offsets(rows * self._columns + first_column)
+        ends = self._get_offsets(rows * self._columns + last_column + 1)
+        if len(rows) == 1:
+            return np.arange(starts[0], ends[0])
+        return np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+
+    def _get_radius_candidates(self, latitude, longitude, radius_km):
+        latitude_delta = radius_km / KM_PER_DEGREE
+        farthest_latitude = min(abs(latitude) + latitude_delta, 89.0)
+        longitude_delta = radius_km / (KM_PER_DEGREE * math.cos(math.radians(farthest_latitude)))
+        return self._get_candidates(latitude - latitude_delta, longitude - longitude_delta,
+                                    latitude + latitude_delta, longitude + longitude_delta)
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """
+        Locations within a distance of a location, nearest first.
+
+        :return: positions of the locations
+        """
+        candidates = self._get_radius_candidates(latitude, longitude, radius_km)
+        distances = get_distances_km(latitude, longitude, self._latitudes[candidates], self._longitudes[candidates])
+        within = distances <= radius_km
+        candidates, distances = candidates[within], distances[within]
+        return self._positions[candidates[np.argsort(distances, kind='stable')]]
+
+    def within_bounding_box(self, min_latitude, min_longitude, max_latitude, max_longitude):
+        """
+        Locations within a bounding box, bounds included.
+
+        :return: positions of the locations, in ascending order
+        """
+        candidates = self._get_candidates(min_latitude, min_longitude, max_latitude, max_longitude)
+        latitudes, longitudes = self._latitudes[candidates], self._longitudes[candidates]
+        within = (latitudes >= min_latitude) & (latitudes <= max_latitude) & \
+                 (longitudes >= min_longitude) & (longitudes <= max_longitude)
+        return np.sort(self._positions[candidates[within]])
+
+    def nearest(self, latitude, longitude, k=1):
+        """
+        The k locations nearest to a location, nearest first.
+
+        Searches a growing radius, doubled until it holds k locations; they are then the nearest, since any
+        nearer location would be within the same radius.
+
+        :return: positions of the locations, fewer than k when fewer are indexed
+        """
+        k = min(k, len(self._positions))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+
+        radius_km = self._cell_size_km
+        while True:
+            positions = self.within_radius(latitude, longitude, radius_km)
+            if len(positions) >= k or len(positions) == len(self._positions):
+                return positions[:k]
+            radius_km *= 2
+
+    def count_within_radius(self, radius_km):
+        """
+        Number of locations within a distance of every indexed location, itself included.
+
+        Counted cell by cell: the locations of a cell are measured at once against the locations of the block of
+        cells around it that the radius can reach, so distances are computed as arrays rather than per location.
+
+        :return: array of the counts by position, 0 for locations without coordinates
+        """
+        counts = np.zeros(self._count, dtype=np.int64)
+        if not len(self._positions):
+            return counts
+
+        # cells are at least cell_size_km on a side wherever the indexed locations are, see __init__
+        reach = int(math.ceil(radius_km / self._cell_size_km))
+        sorted_counts = np.zeros(len(self._positions), dtype=np.int64)
+        for index, cell in enumerate(self._cells):
+            row, column = divmod(int(cell), self._columns)
+            rows = np.arange(max(row - reach, 0), min(row + reach, self._rows - 1) + 1)
+            starts = self._get_offsets(rows * self._columns + max(column - reach, 0))
+            ends = self._get_offsets(rows * self._columns + min(column + reach, self._columns - 1) + 1)
+            candidates = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+            candidate_latitudes, candidate_longitudes = self._latitudes[candidates], self._longitudes[candidates]
+
+            # locations of the cell in blocks, so a dense cell never makes an outsized distance matrix
+            first, last = self._cell_offsets[index], self._cell_offsets[index + 1]
+            block_size = max(1, MAX_DISTANCES // len(candidates))
+            for block_start in range(first, last, block_size):
+                block = slice(block_start, min(block_start + block_size, last))
+                distances = get_distances_km(self._latitudes[block, None], self._longitudes[block, None],
+                                             candidate_latitudes, candidate_longitudes)
+                sorted_counts[block] = np.count_nonzero(distances <= radius_km, axis=1)
+
+        counts[self._positions] = sorted_counts
+        return counts
+
+    def hotspots(self, radius_km, min_count):
+        """
+        Clusters of locations: the location with the most locations within the radius is the center of the first
+        hotspot, which takes them all; the center of the next one has the most locations within the radius
+        that are not taken, and so on while a center has at least min_count of them.
+
+        :return: DataFrame of the hotspots, most locations first, with the position, latitude and longitude
+            of the center, the number of locations and their positions
+        """
+        counts = self.count_within_radius(radius_km)
+        taken = np.zeros(self._count, dtype=bool)
+        hotspots = []
+
+        for center in np.argsort(-counts, kind='stable'):
+            if counts[center] < min_count:
+                break
+            if taken[center]:
+                continue
+
+            index = self._indexes[center]
+            positions = self.within_radius(self._latitudes[index], self._longitudes[index], radius_km)
+            positions = positions[~taken[positions]]
+            if len(positions) < min_count:
+                continue
+
+            taken[positions] = True
+            hotspots.append((center, self._latitudes[index], self._longitudes[index], len(positions), positions))
+
+        return pd.DataFrame(hotspots, columns=['center', 'latitude', 'longitude', 'count', 'positions']) \
+            .sort_values('count', ascending=False, kind='stable') \
+            .reset_index(drop=True)
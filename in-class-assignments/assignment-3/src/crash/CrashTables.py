@@ -0,0 +1,67 @@
+import pandas as pd
+
+from crash.CrashColumns import CRASH_ID, PARTICIPANT_DISPLAY_SEQ, PARTICIPANT_ID, PARTICIPANT_VEHICLE_SEQ, RECORD_TYPE, \
+    VEHICLE_CODED_SEQ, VEHICLE_ID
+from crash.CrashRecordType import CrashRecordType
+
+# columns identifying every record, kept for all records regardless of their record type
+RECORD_KEY_COLUMNS = [CRASH_ID, RECORD_TYPE, VEHICLE_ID, PARTICIPANT_ID]
+
+# columns linking the records of a record type to their crash and vehicle
+KEY_COLUMNS = {
+    CrashRecordType.CRASH: [CRASH_ID],
+    CrashRecordType.VEHICLE: [CRASH_ID, VEHICLE_ID, VEHICLE_CODED_SEQ],
+    CrashRecordType.PARTICIPANT: [CRASH_ID, VEHICLE_ID, PARTICIPANT_ID, PARTICIPANT_DISPLAY_SEQ, VEHICLE_CODED_SEQ,
+                                  PARTICIPANT_VEHICLE_SEQ],
+}
+
+# name of every table, e.g. for storing it
+TABLE_NAMES = {
+    None: 'records',
+    CrashRecordType.CRASH: 'crashes',
+    CrashRecordType.VEHICLE: 'vehicles',
+    CrashRecordType.PARTICIPANT: 'participants',
+}
+
+# first and last of the columns every record type fills. The header of the extract runs four columns ahead
+# of the vehicle and participant fields, so vehicle records start under 'Total Count of Persons Involved'
+# and participant records under 'Safety Equipment Un-used Quantity'.
+COLUMN_RANGES = {
+    CrashRecordType.CRASH: ('Serial #', 'Total Vehicle Occupant Count'),
+    CrashRecordType.VEHICLE: ('Total Count of Persons Involved', 'Safety Equipment Used Quantity'),
+    CrashRecordType.PARTICIPANT: ('Safety Equipment Un-used Quantity', 'Participant Striker Flag'),
+}
+
+
+def get_table_columns(columns, record_type):
+    """
+    Columns of the table of a record type: its key columns followed by the columns it fills.
+
+    :param columns: columns of the mixed-record crash data
+    """
+    columns = list(columns)
+    first_column, last_column = COLUMN_RANGES[record_type]
+    return KEY_COLUMNS[record_type] + columns[columns.index(first_column):columns.index(last_column) + 1]
+
+
+def split_records(df):
+    """
+    Split mixed-record crash data into one table per record type with a single groupby.
+
+    :param df: crash records of all record types
+    :return: dict of CrashRecordType to its table, and of None to the key columns of all records
+    """
+    tables = {None: df[RECORD_KEY_COLUMNS].reset_index(drop=True)}
+
+    valid_record_types = list(map(int, CrashRecordType))
+    for record_type, records in df.groupby(RECORD_TYPE):
+        if record_type in valid_record_types:
+            record_type = CrashRecordType(record_type)
+            table = records[get_table_columns(df.columns, record_type)].reset_index(drop=True)
+            tables[record_type] = table.astype({column: pd.Int64Dtype() for column in KEY_COLUMNS[record_type]})
+
+    for record_type in CrashRecordType:
+        if record_type not in tables:
+            tables[record_type] = pd.DataFrame(columns=get_table_columns(df.columns, record_type))
+
+    return tables
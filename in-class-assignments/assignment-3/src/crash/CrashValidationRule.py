@@ -0,0 +1,114 @@
+from collections import namedtuple
+
+import pandas as pd
+
+from crash.CrashColumns import CRASH_ID
+
+
+class CrashAggregate:
+    """
+    A partial result computed over the records of one record type (or over all records when scope is None).
+
+    Rules that need the same aggregate share one instance of it, so it is computed once per validation.
+    Partial results of different chunks or files of crash data are merged with combine.
+    """
+
+    def __init__(self, name, scope, columns, compute, combine):
+        """
+        :param name: unique name of the aggregate
+        :param scope: CrashRecordType of the records the aggregate is computed over, None for all records
+        :param columns: columns read by compute
+        :param compute: function of the scoped records returning the partial result
+        :param combine: function merging two partial results into one
+        """
+        self.name = name
+        self.scope = scope
+        self.columns = [CRASH_ID] + [column for column in columns if column != CRASH_ID]
+        self.compute = compute
+        self.combine = combine
+
+
+class CrashValidationRule:
+    """
+    A named check of crash data, evaluated from an aggregate once all the records have been seen.
+    """
+
+    def __init__(self, name, description, aggregate, finish):
+        """
+        :param name: unique name of the rule
+        :param description: what the rule expects of the crash data
+        :param aggregate: CrashAggregate the rule is evaluated from
+        :param finish: function of the aggregate's result returning (passed, violating crash IDs, details)
+        """
+        self.name = name
+        self.description = description
+        self.aggregate = aggregate
+        self.finish = finish
+
+    @property
+    def scope(self):
+        return self.aggregate.scope
+
+    @property
+    def columns(self):
+        return self.aggregate.columns
+
+
+def _combine_crash_ids(crash_ids, other_crash_ids):
+    return crash_ids.union(other_crash_ids)
+
+
+def record_rule(name, description, scope, columns, is_valid):
+    """
+    Create a rule that every record in scope has to satisfy, violating records are reported by their Crash ID.
+
+    :param is_valid: function of the scoped records returning a boolean Series, True for valid records, NA for invalid ones
+    """
+    def compute(records):
+        invalid = ~is_valid(records).fillna(False).astype(bool)
+        return pd.Index(records.loc[invalid, CRASH_ID].unique())
+
+    def finish(crash_ids):
+        return crash_ids.empty, sorted(crash_ids), ''
+
+    aggregate = CrashAggregate(name, scope, columns, compute, _combine_crash_ids)
+    return CrashValidationRule(name, description, aggregate, finish)
+
+
+CrashRuleResult = namedtuple('CrashRuleResult', ['name', 'description', 'passed', 'crash_ids', 'details'])
+
+
+class CrashValidationReport:
+    """
+    Outcome of every validation rule, including the Crash IDs violating each failed rule.
+    """
+
+    def __init__(self, results):
+        self.results = results
+
+    @property
+    def passed(self):
+        return all(result.passed for result in self.results)
+
+    @property
+    def failed_results(self):
+        return [result for result in self.results if not result.passed]
+
+    def to_dict(self):
+        return {
+            'passed': self.passed,
+            'rules': [dict(result._asdict(), crash_ids=[int(crash_id) for crash_id in result.crash_ids])
+                      for result in self.results],
+        }
+
+    @staticmethod
+    def format_result(result):
+        line = '[{}] {}: {}'.format('PASS' if result.passed else 'FAIL', result.name, result.description)
+        if result.details:
+            line += ' ({})'.format(result.details)
+        if result.crash_ids:
+            line += ', violating Crash IDs: {}'.format([int(crash_id) for crash_id in result.crash_ids])
+        return line
+
+    def __str__(self):
+        return '\n'.join(map(self.format_result, self.results))
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import pandas as pd
+
+from crash.CrashColumns import AGE, COLLISION_TYPE, CRASH_DATE, CRASH_ID, RECORD_TYPE, SCHOOL_ZONE_INDICATOR, \
+    TOTAL_INJURY_FATALITY_COUNT
+from crash.CrashRecordType import CrashRecordType
+from crash.CrashValidationRule import CrashAggregate, CrashValidationRule, record_rule
+
+# Collision Type code of 1 = collision occurred at an angle, codes are read as text (see CrashSchema)
+ANGLE_COLLISION_TYPE = '1'
+
+
+def _add(partial, other_partial):
+    return partial + other_partial
+
+
+def _add_counts(counts, other_counts):
+    return counts.add(other_counts, fill_value=0)
+
+
+# records of every type per crash: DataFrame indexed by Crash ID with one column per record type
+def _count_records_by_crash(records):
+    return records.groupby([CRASH_ID, RECORD_TYPE]).size().unstack(fill_value=0)
+
+
+def _get_record_counts(record_counts, record_type):
+    return record_counts.reindex(columns=list(CrashRecordType), fill_value=0)[record_type]
+
+
+RECORD_COUNT = CrashAggregate('record_count', None, [], len, _add)
+
+RECORD_COUNTS_BY_CRASH = CrashAggregate('record_counts_by_crash', None, [RECORD_TYPE],
+                                        _count_records_by_crash, _add_counts)
+
+SCHOOL_ZONE_COUNTS = CrashAggregate('school_zone_counts', CrashRecordType.CRASH, [SCHOOL_ZONE_INDICATOR],
+                                    lambda crashes: (crashes[SCHOOL_ZONE_INDICATOR] == 1).fillna(False).value_counts(),
+                                    _add_counts)
+
+COLLISION_TYPE_COUNTS = CrashAggregate('collision_type_counts', CrashRecordType.CRASH, [COLLISION_TYPE],
+                                       lambda crashes: crashes[COLLISION_TYPE].value_counts(dropna=False),
+                                       _add_counts)
+
+
+def _finish_crashes_without_vehicles(record_counts):
+    vehicle_counts = _get_record_counts(record_counts, CrashRecordType.VEHICLE)
+    crash_ids = vehicle_counts.index[vehicle_counts == 0]
+    return crash_ids.empty, list(crash_ids), ''
+
+
+def _finish_duplicate_crash_ids(record_counts):
+    crash_counts = _get_record_counts(record_counts, CrashRecordType.CRASH)
+    crash_ids = crash_counts.index[crash_counts > 1]
+    return crash_ids.empty, list(crash_ids), ''
+
+
+# the Crash IDs of the records of a type have to be exactly the Crash IDs of the crashes
+def _finish_unknown_crash_ids(record_type):
+    def finish(record_counts):
+        has_crash = _get_record_counts(record_counts, CrashRecordType.CRASH) > 0
+        has_records = _get_record_counts(record_counts, record_type) > 0
+        crash_ids = record_counts.index[has_crash != has_records]
+        return crash_ids.empty, list(crash_ids), ''
+    return finish
+
+
+def _finish_most_crashes_with_2_vehicles(record_counts):
+    vehicle_counts = _get_record_counts(record_counts, CrashRecordType.VEHICLE)
+    crashes_with_at_least_2_vehicles_count = int((vehicle_counts >= 2).sum())
+    return crashes_with_at_least_2_vehicles_count > len(record_counts) / 2, [], \
+        '{} of {} crashes'.format(crashes_with_at_least_2_vehicles_count, len(record_counts))
+
+
+def _finish_most_crashes_outside_school_zones(school_zone_counts):
+    in_school_zone_count = int(school_zone_counts.get(True, 0))
+    outside_school_zone_count = int(school_zone_counts.get(False, 0))
+    return in_school_zone_count < outside_school_zone_count, [], \
+        '{} crashes in school zones, {} outside'.format(in_school_zone_count, outside_school_zone_count)
+
+
+def _finish_most_collisions_at_angle(collision_type_counts):
+    angle_count = int(collision_type_counts.get(ANGLE_COLLISION_TYPE, 0))
+    crash_count = int(collision_type_counts.sum())
+    return angle_count > crash_count / 2, [], '{} of {} crashes'.format(angle_count, crash_count)
+
+
+# all rules, reported in this order
+CRASH_VALIDATION_RULES = [
+    CrashValidationRule('not_empty', 'Crash data is not empty', RECORD_COUNT,
+                        lambda record_count: (record_count > 0, [], '{} records'.format(record_count))),
+    record_rule('valid_record_types', 'Every record has a {} record type'.format(CrashRecordType.__name__),
+                None, [RECORD_TYPE],
+                lambda records: records[RECORD_TYPE].isin(list(map(int, CrashRecordType)))),
+    record_rule('valid_crash_dates', 'Crash month, day and year of every crash is a valid date in the past',
+                CrashRecordType.CRASH, [CRASH_DATE],
+                lambda crashes: crashes[CRASH_DATE] < pd.to_datetime(datetime.now())),
+    CrashValidationRule('crash_has_vehicle', 'Every crash has at least 1 vehicle associated with it',
+                        RECORD_COUNTS_BY_CRASH, _finish_crashes_without_vehicles),
+    record_rule('participant_age_not_negative', 'Crash participants age is not negative',
+                CrashRecordType.PARTICIPANT, [AGE],
+                lambda participants: ~(participants[AGE] < 0).fillna(False)),
+    record_rule('crash_has_fatality_or_injury', 'There is at least 1 fatality or injury for a given crash',
+                CrashRecordType.CRASH, [TOTAL_INJURY_FATALITY_COUNT],
+                lambda crashes: crashes[TOTAL_INJURY_FATALITY_COUNT] >= 1),
+    CrashValidationRule('unique_crash_id', 'Every crash has a unique id',
+                        RECORD_COUNTS_BY_CRASH, _finish_duplicate_crash_ids),
+    CrashValidationRule('most_crashes_outside_school_zones', 'Most crashes happen outside of school zones',
+                        SCHOOL_ZONE_COUNTS, _finish_most_crashes_outside_school_zones),
+    CrashValidationRule('participants_of_known_crashes',
+                        'Every crash participant has a Crash ID of a known crash, and every crash has participants',
+                        RECORD_COUNTS_BY_CRASH, _finish_unknown_crash_ids(CrashRecordType.PARTICIPANT)),
+    CrashValidationRule('vehicles_of_known_crashes',
+                        'Every vehicle has a Crash ID of a known crash, and every crash has vehicles',
+                        RECORD_COUNTS_BY_CRASH, _finish_unknown_crash_ids(CrashRecordType.VEHICLE)),
+    CrashValidationRule('most_crashes_with_2_vehicles', 'Most crashes involve at-least two vehicles',
+                        RECORD_COUNTS_BY_CRASH, _finish_most_crashes_with_2_vehicles),
+    CrashValidationRule('most_collisions_at_angle', 'Most collisions happen at an angle',
+                        COLLISION_TYPE_COUNTS, _finish_most_collisions_at_angle),
+]
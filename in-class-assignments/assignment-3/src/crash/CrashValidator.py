@@ -0,0 +1,179 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from crash.CrashColumns import RECORD_TYPE
+from crash.CrashDerivedColumns import DERIVED_COLUMNS, add_derived_columns, get_source_columns
+from crash.CrashValidationRule import CrashRuleResult, CrashValidationReport
+
+# name the time spent computing derived columns is kept under, besides the names of the aggregates
+DERIVED_COLUMNS_TIMING = 'derived columns'
+
+
+class CrashValidator:
+    """
+    Evaluates crash validation rules in one pass per record type scope.
+
+    Rules are evaluated from aggregates; the aggregates of a scope are computed together from the table
+    of the scope's record type, reading only the columns they declare, and different scopes are computed in parallel.
+    Computing the aggregates is split from finishing the rules, so that the aggregates of several chunks
+    or files of crash data can be combined before the rules are evaluated.
+    """
+
+    def __init__(self, rules):
+        self._rules = rules
+
+        self._aggregates_by_scope = defaultdict(dict)
+        for rule in rules:
+            self._aggregates_by_scope[rule.scope][rule.aggregate.name] = rule.aggregate
+
+        # seconds spent computing the derived columns and every aggregate, combining and finishing every rule
+        self.compute_seconds = defaultdict(float)
+        self.combine_seconds = 0.0
+        self.finish_seconds = {}
+
+    @property
+    def columns(self):
+        """
+        Columns read by the rules, e.g. to read only these from a crash data file. Derived columns are replaced
+        by the columns they are derived from.
+        """
+        return get_source_columns([RECORD_TYPE] + [column for aggregates in self._aggregates_by_scope.values()
+                                                   for aggregate in aggregates.values()
+                                                   for column in aggregate.columns])
+
+    @property
+    def derived_columns(self):
+        """
+        Derived columns read by the rules from the table of their record type, which compute can be given
+        already computed instead of deriving them again.
+        """
+        return list(dict.fromkeys(column for scope, aggregates in self._aggregates_by_scope.items()
+                                  for aggregate in aggregates.values() for column in aggregate.columns
+                                  if column in DERIVED_COLUMNS and DERIVED_COLUMNS[column].record_type == scope))
+
+    def compute(self, df=None, tables=None, derived=None):
+        """
+        Compute the aggregates of all rules over crash records.
+
+        :param df: crash records of all record types, with at least the columns read by the rules; split by
+            record type unless tables is given
+        :param tables: dict of CrashRecordType to its table, and of None to all records, as made by split_records
+        :param derived: dict of derived column name to its Series aligned with the table of its record type, used
+            instead of deriving the column again, e.g. the columns memoized by CrashDataSet.derived
+        :return: dict of aggregate name to its partial result
+        """
+        if tables is None:
+            tables = self._split_scopes(df)
+
+        with ThreadPoolExecutor(max_workers=len(self._aggregates_by_scope)) as executor:
+            return self._compute(tables, executor, derived)
+
+    def _compute(self, tables, executor, derived=None):
+        derived = derived or {}
+        futures = [executor.submit(self._compute_scope, tables[scope], aggregates,
+                                   {name: column for name, column in derived.items()
+                                    if DERIVED_COLUMNS[name].record_type == scope})
+                   for scope, aggregates in self._aggregates_by_scope.items()]
+        results = {}
+        for future in futures:
+            scope_results, scope_seconds = future.result()
+            results.update(scope_results)
+            self.add_compute_seconds(scope_seconds)
+        return results
+
+    # records of every scope; only the rows are split, the aggregates of a scope read just the columns they declare
+    def _split_scopes(self, df):
+        return {scope: df if scope is None else df[df[RECORD_TYPE].eq(scope).fillna(False)]
+                for scope in self._aggregates_by_scope}
+
+    # aggregates of a scope and the seconds spent on them, which the calling thread adds to compute_seconds
+    def _compute_scope(self, records, aggregates, derived):
+        seconds = {}
+        start = time.perf_counter()
+        columns = list(dict.fromkeys(column for aggregate in aggregates.values() for column in aggregate.columns))
+        given_columns = {column: derived[column] for column in columns if column in derived}
+        if given_columns:
+            records = records.assign(**given_columns)
+        records = add_derived_columns(records, columns)[columns]
+        seconds[DERIVED_COLUMNS_TIMING] = time.perf_counter() - start
+
+        results = {}
+        for name, aggregate in aggregates.items():
+            start = time.perf_counter()
+            results[name] = aggregate.compute(records)
+            seconds[name] = time.perf_counter() - start
+        return results, seconds
+
+    def combine(self, results, other_results):
+        """
+        Merge the aggregates computed over two parts of the crash data.
+        """
+        start = time.perf_counter()
+        combined = {name: aggregate.combine(results[name], other_results[name])
+                    for aggregates in self._aggregates_by_scope.values()
+                    for name, aggregate in aggregates.items()}
+        self.combine_seconds += time.perf_counter() - start
+        return combined
+
+    def add_compute_seconds(self, compute_seconds):
+        """
+        Add the seconds spent computing aggregates elsewhere, e.g. by another process of the same rules.
+        """
+        for name, seconds in compute_seconds.items():
+            self.compute_seconds[name] += seconds
+
+    def get_timings(self):
+        """
+        Seconds spent on every rule: computing its aggregate, which is shared by the rules of the same aggregate,
+        and finishing it from the aggregate.
+
+        :return: dict of the timings of every rule by name, of the derived columns and of combining aggregates
+        """
+        return {
+            'rules': {rule.name: {'aggregate': rule.aggregate.name,
+                                  'compute_seconds': self.compute_seconds.get(rule.aggregate.name, 0.0),
+                                  'finish_seconds': self.finish_seconds.get(rule.name, 0.0)}
+                      for rule in self._rules},
+            'derived_columns_seconds': self.compute_seconds.get(DERIVED_COLUMNS_TIMING, 0.0),
+            'combine_seconds': self.combine_seconds,
+        }
+
+    def finish(self, results):
+        """
+        Evaluate every rule from the aggregates of all of the crash data.
+
+        :return: CrashValidationReport
+        """
+        rule_results = []
+        for rule in self._rules:
+            start = time.perf_counter()
+            passed, crash_ids, details = rule.finish(results[rule.aggregate.name])
+            self.finish_seconds[rule.name] = time.perf_counter() - start
+            rule_results.append(CrashRuleResult(rule.name, rule.description, bool(passed), crash_ids, details))
+        return CrashValidationReport(rule_results)
+
+    def validate(self, df=None, tables=None):
+        return self.finish(self.compute(df, tables))
+
+    def validate_chunks(self, chunks):
+        """
+        Validate crash data streamed in chunks, e.g. by pd.read_csv(chunksize=...).
+
+        Only one chunk and the combined aggregates of the chunks read so far are held at a time, so memory is
+        bounded by the chunk size and the number of crashes rather than by the number of records. Records of
+        a crash may be spread over several chunks.
+
+        :param chunks: iterable of DataFrames of crash records of all record types
+        :return: CrashValidationReport, the same as validating all chunks at once
+        :raises ValueError: when there are no chunks
+        """
+        results = None
+        with ThreadPoolExecutor(max_workers=len(self._aggregates_by_scope)) as executor:
+            for chunk in chunks:
+                chunk_results = self._compute(self._split_scopes(chunk), executor)
+                results = chunk_results if results is None else self.combine(results, chunk_results)
+
+        if results is None:
+            raise ValueError('No chunks of crash data to validate')
+        return self.finish(results)
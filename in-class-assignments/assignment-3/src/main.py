@@ -1,11 +1,105 @@
+import argparse
+import cProfile
 import logging
 
-from crash.CrashDataSet import CrashDataSet
+from crash.CrashDataSet import CHUNK_SIZE, DATA_FILE, CrashDataSet
+from crash.CrashProfiler import CrashProfiler
+from crash.CrashValidationRules import CRASH_VALIDATION_RULES
+from crash.CrashValidator import CrashValidator
 
 logging.basicConfig(format="'%(asctime)s' %(name)s : %(message)s'", level=logging.DEBUG)
 logger = logging.getLogger('main')
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Describe and validate crash data.')
+    parser.add_argument('--files', nargs='+', default=[DATA_FILE],
+                        help='crash data files, glob patterns or manifests (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true', help='parse the files even when their tables are cached')
+    parser.add_argument('--stream', type=int, nargs='?', const=CHUNK_SIZE, metavar='CHUNKSIZE',
+                        help='validate the files in chunks of CHUNKSIZE records without loading them '
+                             '(default CHUNKSIZE: %(const)s)')
+    parser.add_argument('--postgres', metavar='DSN',
+                        help='export the crash, vehicle and participant tables to the Postgres database of DSN')
+    parser.add_argument('--profile', action='store_true',
+                        help='log the wall time, peak memory and records of every stage and the time of every rule; '
+                             'the peak memory of the workers loading several files is in the profile of every file')
+    parser.add_argument('--json', metavar='FILE', help='write the profile summary to FILE, implies --profile')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='write cProfile statistics of the run to FILE, of this process only: the workers loading '
+                             'several files show as waiting')
+    parser.add_argument('--pyinstrument', metavar='FILE',
+                        help='write a pyinstrument HTML report of the run to FILE, of this process only like --cprofile')
+    return parser.parse_args()
+
+
+def run(args, profiler):
+    if args.stream:
+        validator = CrashValidator(CRASH_VALIDATION_RULES)
+        for path in CrashDataSet.get_data_files(args.files):
+            with profiler.stage('describe {}'.format(path)):
+                CrashDataSet.describe_crash_file(path, chunksize=args.stream)
+            with profiler.stage('validate {}'.format(path)):
+                CrashDataSet.validate_crash_file(path, chunksize=args.stream, validator=validator)
+        return validator.get_timings()
+
+    with profiler.stage('load') as stage:
+        crash_data_set = CrashDataSet(args.files, use_cache=not args.no_cache)
+        stage['records'] = len(crash_data_set.records)
+    with profiler.stage('describe') as stage:
+        crash_data_set.describe()
+        stage['records'] = len(crash_data_set.records)
+    with profiler.stage('validate') as stage:
+        crash_data_set.validate_crash_data()
+        stage['records'] = len(crash_data_set.records)
+    if args.postgres:
+        with profiler.stage('export') as stage:
+            crash_data_set.export_to_postgres(args.postgres)
+            stage['records'] = len(crash_data_set.records)
+    return crash_data_set.profile
+
+
+def main():
+    args = parse_args()
+    profiling = args.profile or args.json
+    profiler = CrashProfiler(trace_memory=profiling)
+
+    c_profile = cProfile.Profile() if args.cprofile else None
+    instrument_profiler = None
+    if args.pyinstrument:
+        try:
+            from pyinstrument import Profiler
+            instrument_profiler = Profiler()
+        except ImportError as ex:
+            logger.warning('Unable to profile with pyinstrument: %s', ex)
+
+    profiler.start()
+    if c_profile:
+        c_profile.enable()
+    if instrument_profiler:
+        instrument_profiler.start()
+    try:
+        timings = run(args, profiler)
+    finally:
+        if instrument_profiler:
+            instrument_profiler.stop()
+            with open(args.pyinstrument, mode='w') as file:
+                file.write(instrument_profiler.output_html())
+            logger.info('Wrote pyinstrument report to %s', args.pyinstrument)
+        if c_profile:
+            c_profile.disable()
+            c_profile.dump_stats(args.cprofile)
+            logger.info('Wrote cProfile statistics to %s', args.cprofile)
+        profiler.stop()
+
+    if profiling:
+        profiler.add_details(**timings)
+        for name, rule_timings in timings['rules'].items():
+            logger.info('Rule %s took %.3fs to compute its aggregate %s and %.3fs to finish', name,
+                        rule_timings['compute_seconds'], rule_timings['aggregate'], rule_timings['finish_seconds'])
+        if args.json:
+            profiler.write_json(args.json)
+
+
 if __name__ == '__main__':
-    crash_data_set = CrashDataSet()
-    crash_data_set.describe()
-    crash_data_set.validate_crash_data()
+    main()
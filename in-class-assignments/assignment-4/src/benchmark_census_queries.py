@@ -0,0 +1,210 @@
+# this program benchmarks a representative query workload against a loaded CensusData table and
+# measures what each candidate index buys the queries and costs the loader
+# run it with -h to see the command line options
+
+# Every query of the workload is run with EXPLAIN (ANALYZE, BUFFERS) without any candidate index, then
+# each candidate index is built on its own and the workload is replayed. For every candidate the report
+# shows the index size, its build time, how much slower a load into a table carrying the index gets,
+# and the latency and buffer change of every query.
+
+import argparse
+import json
+import time
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Repeats = 5  # runs of each query, the median execution time is reported
+ReportFile = None  # optional JSON report
+MinSpeedupPct = 25.0  # an index is suggested when a query using it gets at least this much faster
+State = 'Oregon'
+County = 'Washington County'
+
+# name -> SQL of the queries our analysis actually runs, %(state)s and %(county)s are filled in from the options
+Workload = {
+    'state_county_lookup': f"SELECT * FROM {TableName} WHERE State = %(state)s AND County = %(county)s;",
+    'county_population': f"""
+        SELECT County, SUM(TotalPop), SUM(IncomePerCap * TotalPop) / NULLIF(SUM(TotalPop), 0)
+        FROM {TableName} WHERE State = %(state)s GROUP BY County;""",
+    'population_by_year': f"SELECT Year, SUM(TotalPop) FROM {TableName} GROUP BY Year;",
+    'latest_year_by_state': f"""
+        SELECT State, AVG(Poverty) FROM {TableName}
+        WHERE Year = (SELECT MAX(Year) FROM {TableName}) GROUP BY State;""",
+    'income_range': f"SELECT CensusTract, Income FROM {TableName} WHERE Income BETWEEN 150000 AND 250000;",
+    'high_poverty_tracts': f"SELECT CensusTract, State, County FROM {TableName} WHERE Poverty > 40;",
+}
+
+# name -> definition of the candidate indexes, {table} is filled in with the table to index
+CandidateIndexes = {
+    'state_county': "CREATE INDEX idx_bench_state_county ON {table}(State, County);",
+    'state_county_covering': "CREATE INDEX idx_bench_state_county_covering ON {table}(State, County) "
+                             "INCLUDE (TotalPop, IncomePerCap, Poverty);",
+    'year_brin': "CREATE INDEX idx_bench_year_brin ON {table} USING BRIN (Year);",
+    'income': "CREATE INDEX idx_bench_income ON {table}(Income);",
+    'high_poverty_partial': "CREATE INDEX idx_bench_high_poverty ON {table}(Poverty) WHERE Poverty > 40;",
+}
+
+
+def initialize():
+    global Repeats
+    global ReportFile
+    global State
+    global County
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeats", type=int, default=Repeats)
+    parser.add_argument("-o", "--reportfile", help="write the report as JSON to this file")
+    parser.add_argument("-s", "--state", default=State, help="State used by the lookup queries")
+    parser.add_argument("-k", "--county", default=County, help="County used by the lookup queries")
+    parser.add_argument("-i", "--indexes", nargs="+", choices=CandidateIndexes.keys(), default=list(CandidateIndexes),
+                        help="candidate indexes to measure")
+    args = parser.parse_args()
+
+    Repeats = args.repeats
+    ReportFile = args.reportfile
+    State = args.state
+    County = args.county
+    return args.indexes
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = True
+    return connection
+
+
+# names of the indexes used anywhere in a plan tree
+def get_plan_indexes(plan):
+    index_names = {plan['Index Name']} if 'Index Name' in plan else set()
+    for child in plan.get('Plans', []):
+        index_names |= get_plan_indexes(child)
+    return index_names
+
+
+# run a query with EXPLAIN (ANALYZE, BUFFERS) and return its execution time in ms, the buffers it touched,
+# the top plan node and the indexes the plan used
+def explain(cursor, sql):
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, {'state': State, 'county': County})
+    result = cursor.fetchone()[0][0]
+    plan = result['Plan']
+    return (result['Execution Time'], plan['Shared Hit Blocks'] + plan['Shared Read Blocks'], plan['Node Type'],
+            sorted(get_plan_indexes(plan)))
+
+
+def run_workload(conn):
+    results = {}
+    with conn.cursor() as cursor:
+        for name, sql in Workload.items():
+            runs = sorted(explain(cursor, sql) for _ in range(Repeats))
+            execution_time, buffers, node_type, indexes = runs[len(runs) // 2]
+            results[name] = {'ms': execution_time, 'buffers': buffers, 'top_node': node_type, 'indexes': indexes}
+    return results
+
+
+# time a server-side load of the whole table into an empty copy of it carrying the given index
+def time_load(conn, index_definition=None):
+    load_table_name = TableName + "_bench_load"
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            DROP TABLE IF EXISTS {load_table_name};
+            CREATE TABLE {load_table_name} (LIKE {TableName} INCLUDING ALL);
+        """)
+        if index_definition:
+            cursor.execute(index_definition.format(table=load_table_name).replace("idx_bench_", "idx_bench_load_"))
+
+        start = time.perf_counter()
+        cursor.execute(f"INSERT INTO {load_table_name} SELECT * FROM {TableName};")
+        elapsed = time.perf_counter() - start
+
+        cursor.execute(f"DROP TABLE {load_table_name};")
+    return elapsed
+
+
+def measure_index(conn, index_name, baseline_results, baseline_load_time):
+    index_definition = CandidateIndexes[index_name]
+    with conn.cursor() as cursor:
+        start = time.perf_counter()
+        cursor.execute(index_definition.format(table=TableName))
+        build_time = time.perf_counter() - start
+        cursor.execute(f"ANALYZE {TableName};")
+
+        sql_index_name = index_definition.split()[2]
+        cursor.execute("SELECT pg_relation_size(%s::regclass);", (sql_index_name,))
+        index_size = cursor.fetchone()[0]
+
+        results = run_workload(conn)
+        cursor.execute(f"DROP INDEX {sql_index_name};")
+
+    load_time = time_load(conn, index_definition)
+
+    queries = {}
+    for name, result in results.items():
+        baseline = baseline_results[name]
+        queries[name] = dict(result, change_pct=100.0 * (result['ms'] - baseline['ms']) / baseline['ms'])
+
+    return {
+        'size_bytes': index_size,
+        'build_seconds': build_time,
+        'extra_load_seconds': load_time - baseline_load_time,
+        'queries': queries,
+        'sped_up_queries': [name for name, result in queries.items()
+                            if sql_index_name in result['indexes'] and result['change_pct'] <= -MinSpeedupPct],
+    }
+
+
+def print_report(report):
+    print(f"\nBaseline (load {report['baseline']['load_seconds']:0.4} seconds):")
+    for name, result in report['baseline']['queries'].items():
+        print(f"  {name:<24} {result['ms']:>10.3f} ms {result['buffers']:>8} buffers  {result['top_node']}")
+
+    for index_name, measurement in report['indexes'].items():
+        print(f"\nIndex {index_name}: size {measurement['size_bytes'] / 1024:0.1f} kB, "
+              f"build {measurement['build_seconds']:0.4} seconds, "
+              f"extra load time {measurement['extra_load_seconds']:+0.4} seconds")
+        for name, result in measurement['queries'].items():
+            print(f"  {name:<24} {result['ms']:>10.3f} ms ({result['change_pct']:+7.1f}%) "
+                  f"{result['buffers']:>8} buffers  {result['top_node']}")
+
+    print(f"\nSuggested indexes (used by a query that got at least {MinSpeedupPct:0.0f}% faster):")
+    for index_name, measurement in report['indexes'].items():
+        if measurement['sped_up_queries']:
+            print(f"  {index_name:<24} speeds up {', '.join(measurement['sped_up_queries'])}; "
+                  f"costs {measurement['size_bytes'] / 1024:0.1f} kB and "
+                  f"{measurement['extra_load_seconds']:+0.4} seconds per load")
+
+
+def main():
+    index_names = initialize()
+    conn = dbconnect()
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"ANALYZE {TableName};")
+
+    print(f"Running the workload {Repeats} times without candidate indexes ...")
+    baseline_results = run_workload(conn)
+    baseline_load_time = time_load(conn)
+    report = {'baseline': {'load_seconds': baseline_load_time, 'queries': baseline_results}, 'indexes': {}}
+
+    for index_name in index_names:
+        print(f"Measuring index {index_name} ...")
+        report['indexes'][index_name] = measure_index(conn, index_name, baseline_results, baseline_load_time)
+
+    print_report(report)
+
+    if ReportFile:
+        with open(ReportFile, mode="w") as file:
+            json.dump(report, file, indent=2)
+        print(f"\nWrote report to {ReportFile}")
+
+
+if __name__ == "__main__":
+    main()
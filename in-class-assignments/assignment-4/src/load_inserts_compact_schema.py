@@ -0,0 +1,235 @@
+# this program loads Census ACS data into a compact CensusData schema using native fixed-width types
+# run it with -h to see the command line options
+
+# The original schema stores CensusTract and almost every measure as NUMERIC, which is variable-length,
+# slow to parse during COPY and slow to aggregate. The compact schema uses bigint for CensusTract,
+# integer for counts and dollar amounts, real for percentages and smallint for Year. Its columns are
+# ordered from the widest alignment to the narrowest, with the variable-length State and County last,
+# so that no alignment padding is needed between columns.
+# With -x/--compare, the data is loaded into both schemas and their size, load time and
+# aggregate query time are compared.
+
+import argparse
+import csv
+import io
+import statistics
+import time
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+Schema = 'compact'  # 'compact' or 'numeric' (the original schema)
+Compare = False  # load both schemas and compare them instead of loading CensusData
+Repeats = 5  # runs of each comparison query, the median is reported
+
+# (column, type) of the original and of the compact CensusData schema, in table column order
+NumericSchema = [
+    ('Year', 'INTEGER'), ('CensusTract', 'NUMERIC'), ('State', 'TEXT'), ('County', 'TEXT'),
+    ('TotalPop', 'INTEGER'), ('Men', 'INTEGER'), ('Women', 'INTEGER'), ('Hispanic', 'DECIMAL'),
+    ('White', 'DECIMAL'), ('Black', 'DECIMAL'), ('Native', 'DECIMAL'), ('Asian', 'DECIMAL'),
+    ('Pacific', 'DECIMAL'), ('Citizen', 'DECIMAL'), ('Income', 'DECIMAL'), ('IncomeErr', 'DECIMAL'),
+    ('IncomePerCap', 'DECIMAL'), ('IncomePerCapErr', 'DECIMAL'), ('Poverty', 'DECIMAL'),
+    ('ChildPoverty', 'DECIMAL'), ('Professional', 'DECIMAL'), ('Service', 'DECIMAL'), ('Office', 'DECIMAL'),
+    ('Construction', 'DECIMAL'), ('Production', 'DECIMAL'), ('Drive', 'DECIMAL'), ('Carpool', 'DECIMAL'),
+    ('Transit', 'DECIMAL'), ('Walk', 'DECIMAL'), ('OtherTransp', 'DECIMAL'), ('WorkAtHome', 'DECIMAL'),
+    ('MeanCommute', 'DECIMAL'), ('Employed', 'INTEGER'), ('PrivateWork', 'DECIMAL'), ('PublicWork', 'DECIMAL'),
+    ('SelfEmployed', 'DECIMAL'), ('FamilyWork', 'DECIMAL'), ('Unemployment', 'DECIMAL'),
+]
+CompactSchema = [
+    # 8-byte aligned
+    ('CensusTract', 'BIGINT'),
+    # 4-byte aligned: counts and dollar amounts
+    ('TotalPop', 'INTEGER'), ('Men', 'INTEGER'), ('Women', 'INTEGER'), ('Citizen', 'INTEGER'),
+    ('Employed', 'INTEGER'), ('Income', 'INTEGER'), ('IncomeErr', 'INTEGER'), ('IncomePerCap', 'INTEGER'),
+    ('IncomePerCapErr', 'INTEGER'),
+    # 4-byte aligned: percentages and the mean commute in minutes
+    ('Hispanic', 'REAL'), ('White', 'REAL'), ('Black', 'REAL'), ('Native', 'REAL'), ('Asian', 'REAL'),
+    ('Pacific', 'REAL'), ('Poverty', 'REAL'), ('ChildPoverty', 'REAL'), ('Professional', 'REAL'),
+    ('Service', 'REAL'), ('Office', 'REAL'), ('Construction', 'REAL'), ('Production', 'REAL'), ('Drive', 'REAL'),
+    ('Carpool', 'REAL'), ('Transit', 'REAL'), ('Walk', 'REAL'), ('OtherTransp', 'REAL'), ('WorkAtHome', 'REAL'),
+    ('MeanCommute', 'REAL'), ('PrivateWork', 'REAL'), ('PublicWork', 'REAL'), ('SelfEmployed', 'REAL'),
+    ('FamilyWork', 'REAL'), ('Unemployment', 'REAL'),
+    # 2-byte aligned
+    ('Year', 'SMALLINT'),
+    # variable length
+    ('State', 'TEXT'), ('County', 'TEXT'),
+]
+Schemas = {'numeric': NumericSchema, 'compact': CompactSchema}
+
+# aggregate queries used to compare the schemas, {table} is filled in with the table to query
+ComparisonQueries = {
+    'state_totals': "SELECT State, SUM(TotalPop), AVG(Poverty), AVG(Unemployment) FROM {table} GROUP BY State;",
+    'county_weighted_income': """
+        SELECT State, County, SUM(IncomePerCap * TotalPop) / NULLIF(SUM(TotalPop), 0)
+        FROM {table} GROUP BY State, County;""",
+    'commute_by_year': "SELECT Year, AVG(MeanCommute), SUM(Employed) FROM {table} GROUP BY Year;",
+}
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+    global Schema
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-s", "--schema", choices=Schemas.keys(), default=Schema)
+    parser.add_argument("-x", "--compare", action="store_true", help="compare both schemas instead of loading")
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = int(args.year)
+    Schema = args.schema
+    global Compare
+    Compare = args.compare
+
+
+# read the input data file into a list of row strings
+# skip the header row
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        dr = csv.DictReader(fil)
+
+        rowlist = []
+        for row in dr:
+            rowlist.append(row)
+
+    return rowlist
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = True
+    return connection
+
+
+# create a table with the given schema
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn, table_name, schema):
+    column_defs = ",\n".join(f"{name} {column_type}" for name, column_type in schema)
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            DROP TABLE IF EXISTS {table_name};
+            CREATE TABLE {table_name} (
+                {column_defs}
+            );
+            ALTER TABLE {table_name} ADD PRIMARY KEY (Year, CensusTract);
+            CREATE INDEX idx_{table_name}_State ON {table_name}(State);
+        """)
+
+        print(f"Created {table_name}")
+
+
+# the COPY input of the rows for a table with the given schema
+def get_copy_buffer(rows, schema):
+    csv_file_like_object = io.StringIO()
+    for row in rows:
+        row = row2vals(dict(row, Year=Year))
+        values = []
+        for name, column_type in schema:
+            value = row[name]
+            if column_type in ('SMALLINT', 'INTEGER', 'BIGINT'):
+                value = int(float(value))  # the file writes some whole numbers as e.g. 1234.0
+            values.append(str(value))
+        csv_file_like_object.write('|'.join(values) + '\n')
+    csv_file_like_object.seek(0)
+    return csv_file_like_object
+
+
+def load(conn, table_name, schema, rows):
+    csv_file_like_object = get_copy_buffer(rows, schema)
+    columns = ", ".join(name for name, _ in schema)
+
+    with conn.cursor() as cursor:
+        start = time.perf_counter()
+        print(f"Loading data into {table_name} ...")
+
+        cursor.copy_expert(f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT text, DELIMITER '|');",
+                           csv_file_like_object)
+
+        elapsed = time.perf_counter() - start
+        print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+    return elapsed
+
+
+def measure_query(conn, sql):
+    timings = []
+    with conn.cursor() as cursor:
+        for _ in range(Repeats):
+            start = time.perf_counter()
+            cursor.execute(sql)
+            cursor.fetchall()
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+# load the data into one table per schema and compare table size, load time and aggregate query time
+def compare(conn, rows):
+    results = {}
+    for schema_name, schema in Schemas.items():
+        table_name = f"{TableName}_{schema_name}"
+        createTable(conn, table_name, schema)
+        load_time = load(conn, table_name, schema, rows)
+
+        with conn.cursor() as cursor:
+            cursor.execute(f"VACUUM ANALYZE {table_name};")
+            cursor.execute("SELECT pg_relation_size(%s), pg_indexes_size(%s);", (table_name, table_name))
+            table_size, indexes_size = cursor.fetchone()
+
+        query_times = {name: measure_query(conn, sql.format(table=table_name))
+                       for name, sql in ComparisonQueries.items()}
+        results[schema_name] = (load_time, table_size, indexes_size, query_times)
+
+    print(f"\n{'':<28}" + "".join(f"{schema_name:>14}" for schema_name in results))
+    print(f"{'load (s)':<28}" + "".join(f"{result[0]:>14.4f}" for result in results.values()))
+    print(f"{'table size (kB)':<28}" + "".join(f"{result[1] / 1024:>14.0f}" for result in results.values()))
+    print(f"{'indexes size (kB)':<28}" + "".join(f"{result[2] / 1024:>14.0f}" for result in results.values()))
+    for name in ComparisonQueries:
+        print(f"{name + ' (ms)':<28}" + "".join(f"{result[3][name] * 1000:>14.2f}" for result in results.values()))
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+    rows = readdata(Datafile)
+
+    if Compare:
+        compare(conn, rows)
+        return
+
+    if CreateDB:
+        createTable(conn, TableName, Schemas[Schema])
+
+    load(conn, TableName, Schemas[Schema], rows)
+
+
+if __name__ == "__main__":
+    main()
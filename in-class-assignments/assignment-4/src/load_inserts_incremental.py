@@ -0,0 +1,298 @@
+# this program incrementally reloads a year of Census ACS data, sending only the tracts that changed
+# run it with -h to see the command line options
+
+# A content fingerprint (md5 of the loaded row) is kept per (Year, CensusTract) in a side table.
+# The data file is streamed and fingerprinted on the client, compared against the stored fingerprints
+# of the year, and only inserted, changed or deleted tracts are written to Postgres, in one transaction.
+# When a year has no fingerprints yet, all of its rows are replaced, which also bootstraps the fingerprints.
+
+import argparse
+import csv
+import hashlib
+import io
+import time
+from decimal import Decimal
+from typing import Optional, Any
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = int(args.year)
+
+
+# stream the rows of the input data file, without holding the whole file in memory
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        for row in csv.DictReader(fil):
+            yield row
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = False
+    return connection
+
+
+def get_fingerprint_table_name():
+    return TableName + "_fingerprint"
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+         	ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+         	CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+    	""")
+
+        print(f"Created {TableName}")
+
+
+# create the fingerprint table when missing, it is kept across runs to compare the next data file with
+def createFingerprintTable(conn):
+    with conn.cursor() as cursor:
+        fingerprint_table_name = get_fingerprint_table_name()
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {fingerprint_table_name} (
+                Year                INTEGER,
+                CensusTract         NUMERIC,
+                Fingerprint         TEXT,
+                PRIMARY KEY (Year, CensusTract)
+            );
+        """)
+
+
+# forget the fingerprints of all years, e.g. once the target table was re-created empty
+def clearFingerprints(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {get_fingerprint_table_name()};")
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+# the COPY line of a data file row, which is also what gets fingerprinted
+def row2line(row):
+    row = row2vals(row)
+    return '|'.join(map(clean_csv_value, (
+        Year,
+        row['CensusTract'],
+        row['State'],
+        row['County'],
+        row['TotalPop'],
+        row['Men'],
+        row['Women'],
+        row['Hispanic'],
+        row['White'],
+        row['Black'],
+        row['Native'],
+        row['Asian'],
+        row['Pacific'],
+        row['Citizen'],
+        row['Income'],
+        row['IncomeErr'],
+        row['IncomePerCap'],
+        row['IncomePerCapErr'],
+        row['Poverty'],
+        row['ChildPoverty'],
+        row['Professional'],
+        row['Service'],
+        row['Office'],
+        row['Construction'],
+        row['Production'],
+        row['Drive'],
+        row['Carpool'],
+        row['Transit'],
+        row['Walk'],
+        row['OtherTransp'],
+        row['WorkAtHome'],
+        row['MeanCommute'],
+        row['Employed'],
+        row['PrivateWork'],
+        row['PublicWork'],
+        row['SelfEmployed'],
+        row['FamilyWork'],
+        row['Unemployment']
+    ))) + '\n'
+
+
+# the stored fingerprints of the year, keyed by CensusTract
+def get_fingerprints(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT CensusTract, Fingerprint FROM {get_fingerprint_table_name()} WHERE Year = %s;", (Year,))
+        return dict(cursor.fetchall())
+
+
+# compare the data file against the stored fingerprints of the year and return
+# the COPY lines and fingerprint lines of new or changed tracts, and the CensusTracts to delete
+def diff(rows, fingerprints):
+    changed_lines = io.StringIO()
+    changed_fingerprint_lines = io.StringIO()
+    stale_tracts = []  # changed or deleted tracts whose current rows have to go
+    counts = {'inserted': 0, 'changed': 0, 'deleted': 0, 'unchanged': 0}
+
+    seen_tracts = set()
+    for row in rows:
+        line = row2line(row)
+        census_tract = Decimal(row['CensusTract'])  # after row2line, which turns an empty tract into 0
+        seen_tracts.add(census_tract)
+
+        fingerprint = hashlib.md5(line.encode()).hexdigest()
+        stored_fingerprint = fingerprints.get(census_tract)
+        if stored_fingerprint == fingerprint:
+            counts['unchanged'] += 1
+            continue
+
+        if stored_fingerprint is None:
+            counts['inserted'] += 1
+        else:
+            counts['changed'] += 1
+            stale_tracts.append(census_tract)
+        changed_lines.write(line)
+        changed_fingerprint_lines.write(f"{Year}|{census_tract}|{fingerprint}\n")
+
+    for census_tract in fingerprints.keys() - seen_tracts:
+        counts['deleted'] += 1
+        stale_tracts.append(census_tract)
+
+    changed_lines.seek(0)
+    changed_fingerprint_lines.seek(0)
+    return changed_lines, changed_fingerprint_lines, stale_tracts, counts
+
+
+def deleteTracts(conn, census_tracts):
+    with conn.cursor() as cursor:
+        for table_name in (TableName, get_fingerprint_table_name()):
+            cursor.execute(f"DELETE FROM {table_name} WHERE Year = %s AND CensusTract = ANY(%s);", (Year, census_tracts))
+
+
+def deleteYear(conn):
+    with conn.cursor() as cursor:
+        for table_name in (TableName, get_fingerprint_table_name()):
+            cursor.execute(f"DELETE FROM {table_name} WHERE Year = %s;", (Year,))
+
+
+def load(conn, rows):
+    start = time.perf_counter()
+    print(f"Comparing data with the fingerprints of {Year} ...")
+
+    fingerprints = get_fingerprints(conn)
+    if not fingerprints:
+        print(f"Found no fingerprints for {Year}, replacing all of its rows")
+        deleteYear(conn)
+
+    changed_lines, changed_fingerprint_lines, stale_tracts, counts = diff(rows, fingerprints)
+    print(f"Found {counts['inserted']} inserted, {counts['changed']} changed, {counts['deleted']} deleted "
+          f"and {counts['unchanged']} unchanged tracts")
+
+    with conn.cursor() as cursor:
+        if stale_tracts:
+            deleteTracts(conn, stale_tracts)
+        cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH (FORMAT text, DELIMITER '|');", changed_lines)
+        cursor.copy_expert(f"COPY {get_fingerprint_table_name()} FROM STDIN WITH (FORMAT text, DELIMITER '|');",
+                           changed_fingerprint_lines)
+
+    conn.commit()
+
+    elapsed = time.perf_counter() - start
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+    rows = readdata(Datafile)
+
+    createFingerprintTable(conn)
+    if CreateDB:
+        createTable(conn)
+        clearFingerprints(conn)
+
+    load(conn, rows)
+
+
+if __name__ == "__main__":
+    main()
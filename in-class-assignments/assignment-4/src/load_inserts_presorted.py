@@ -0,0 +1,273 @@
+# this program loads Census ACS data sorted by (Year, State, CensusTract), building the constraints afterwards
+# run it with -h to see the command line options
+
+# The rows are sorted on the client with an external merge sort that holds at most MaxRowsInMemory rows
+# at a time: sorted runs are spilled to temporary files and then merged while being streamed into COPY.
+# The heap comes out physically clustered by State, our most common access path, and the primary key
+# and State index are built afterwards from already ordered input.
+
+import argparse
+import csv
+import heapq
+import io
+import tempfile
+import time
+from typing import Optional, Any
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+MaxRowsInMemory = 100000  # rows sorted in memory at a time, larger inputs are spilled to sorted run files
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+    global MaxRowsInMemory
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-m", "--maxrows", type=int, default=MaxRowsInMemory,
+                        help="rows sorted in memory at a time")
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = int(args.year)
+    MaxRowsInMemory = args.maxrows
+
+
+# stream the rows of the input data file, without holding the whole file in memory
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        for row in csv.DictReader(fil):
+            yield row
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = True
+    return connection
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+    	""")
+
+        print(f"Created {TableName}")
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+def row2line(row):
+    row = row2vals(row)
+    return '|'.join(map(clean_csv_value, (
+        Year,
+        row['CensusTract'],
+        row['State'],
+        row['County'],
+        row['TotalPop'],
+        row['Men'],
+        row['Women'],
+        row['Hispanic'],
+        row['White'],
+        row['Black'],
+        row['Native'],
+        row['Asian'],
+        row['Pacific'],
+        row['Citizen'],
+        row['Income'],
+        row['IncomeErr'],
+        row['IncomePerCap'],
+        row['IncomePerCapErr'],
+        row['Poverty'],
+        row['ChildPoverty'],
+        row['Professional'],
+        row['Service'],
+        row['Office'],
+        row['Construction'],
+        row['Production'],
+        row['Drive'],
+        row['Carpool'],
+        row['Transit'],
+        row['Walk'],
+        row['OtherTransp'],
+        row['WorkAtHome'],
+        row['MeanCommute'],
+        row['Employed'],
+        row['PrivateWork'],
+        row['PublicWork'],
+        row['SelfEmployed'],
+        row['FamilyWork'],
+        row['Unemployment']
+    ))) + '\n'
+
+
+# sort key of a COPY line: (Year, State, CensusTract)
+def line_key(line):
+    year, census_tract, state = line.split('|', 3)[:3]
+    return int(year), state, int(census_tract)
+
+
+# sort the lines in runs of at most MaxRowsInMemory, spilling every run to a temporary file
+def write_sorted_runs(lines):
+    run_files = []
+    run = []
+    for line in lines:
+        run.append(line)
+        if len(run) >= MaxRowsInMemory:
+            run_files.append(write_run(run))
+            run = []
+    if run:
+        run_files.append(write_run(run))
+    return run_files
+
+
+def write_run(run):
+    run.sort(key=line_key)
+    run_file = tempfile.TemporaryFile(mode="w+")
+    run_file.writelines(run)
+    run_file.seek(0)
+    return run_file
+
+
+# read-only file object over an iterator of lines, so that COPY can consume the merged runs as a stream
+class LineStream(io.TextIOBase):
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            self._buffer += line
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def load(conn, rows):
+    start = time.perf_counter()
+    print(f"Sorting data in runs of {MaxRowsInMemory} rows ...")
+
+    run_files = write_sorted_runs(row2line(row) for row in rows)
+    print(f"Merging {len(run_files)} sorted run(s) into {TableName} ...")
+
+    with conn.cursor() as cursor:
+        merged_lines = heapq.merge(*run_files, key=line_key)
+        cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH (FORMAT text, DELIMITER '|');", LineStream(merged_lines))
+
+    for run_file in run_files:
+        run_file.close()
+
+    elapsed = time.perf_counter() - start
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+def add_constraints(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+                        ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+                        CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+                        """)
+    print("Added constraints after loading data.")
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+    rows = readdata(Datafile)
+
+    if CreateDB:
+        createTable(conn)
+
+    load(conn, rows)
+
+    if CreateDB:
+        add_constraints(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# this program loads Census ACS data into several Postgres nodes, hash-sharding the rows by a shard key
+# run it with -h to see the command line options
+
+# Every node gets its own CensusData table. Each row is routed to a node by hashing its shard key
+# (State or CensusTract), and every node is fed by its own COPY stream, all streams running concurrently.
+# With State as the shard key all tracts of a state live on one node, so State lookups go to a single node.
+
+import argparse
+import csv
+import io
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+DSNs = [f"host=localhost dbname={DBname} user={DBuser} password={DBpwd}"]  # one DSN per shard node
+ShardKey = 'State'  # row column used to pick the shard of each row
+LookupState = None  # state to look up on its shard after loading
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+    global ShardKey
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-n", "--dsn", action="append", help="DSN of a shard node, repeat once per node")
+    parser.add_argument("-k", "--shardkey", choices=['State', 'CensusTract'], default=ShardKey)
+    parser.add_argument("-l", "--lookupstate", help="look up the tracts of this state after loading")
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = args.year
+    global DSNs
+    if args.dsn:
+        DSNs = args.dsn
+    ShardKey = args.shardkey
+    global LookupState
+    LookupState = args.lookupstate
+
+
+# read the input data file into a list of row strings
+# skip the header row
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        dr = csv.DictReader(fil)
+
+        rowlist = []
+        for row in dr:
+            rowlist.append(row)
+
+    return rowlist
+
+
+# connect to one shard node
+def dbconnect(dsn):
+    connection = psycopg2.connect(dsn)
+    connection.autocommit = True
+    return connection
+
+
+# stable across runs and machines, unlike hash() on strings
+def get_shard_index(key_value):
+    return zlib.crc32(str(key_value).encode()) % len(DSNs)
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+         	ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+         	CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+    	""")
+
+        print(f"Created {TableName}")
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+# split the rows into one COPY buffer per shard node
+def partition(rows):
+    shard_buffers = [io.StringIO() for _ in DSNs]
+    for row in rows:
+        row = row2vals(row)
+        shard_buffers[get_shard_index(row[ShardKey])].write('|'.join(map(clean_csv_value, (
+            Year,
+            row['CensusTract'],
+            row['State'],
+            row['County'],
+            row['TotalPop'],
+            row['Men'],
+            row['Women'],
+            row['Hispanic'],
+            row['White'],
+            row['Black'],
+            row['Native'],
+            row['Asian'],
+            row['Pacific'],
+            row['Citizen'],
+            row['Income'],
+            row['IncomeErr'],
+            row['IncomePerCap'],
+            row['IncomePerCapErr'],
+            row['Poverty'],
+            row['ChildPoverty'],
+            row['Professional'],
+            row['Service'],
+            row['Office'],
+            row['Construction'],
+            row['Production'],
+            row['Drive'],
+            row['Carpool'],
+            row['Transit'],
+            row['Walk'],
+            row['OtherTransp'],
+            row['WorkAtHome'],
+            row['MeanCommute'],
+            row['Employed'],
+            row['PrivateWork'],
+            row['PublicWork'],
+            row['SelfEmployed'],
+            row['FamilyWork'],
+            row['Unemployment']
+        ))) + '\n')
+
+    for shard_buffer in shard_buffers:
+        shard_buffer.seek(0)
+    return shard_buffers
+
+
+def load_shard(conn, shard_buffer):
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH (FORMAT text, DELIMITER '|');", shard_buffer)
+        return cursor.rowcount
+
+
+def load(conns, rows):
+    shard_buffers = partition(rows)
+
+    start = time.perf_counter()
+    print(f"Loading data into {len(conns)} shard(s) by {ShardKey} ...")
+
+    # psycopg2 releases the GIL while it waits on the server, so one thread per node is enough
+    # to keep every node's COPY stream busy at the same time
+    with ThreadPoolExecutor(max_workers=len(conns)) as executor:
+        row_counts = list(executor.map(load_shard, conns, shard_buffers))
+
+    elapsed = time.perf_counter() - start
+    for shard_index, row_count in enumerate(row_counts):
+        print(f"Loaded {row_count} rows into shard {shard_index}")
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+# return the CensusData rows of the given state, asking only the node that holds them when possible
+def lookup_state(conns, state):
+    if ShardKey == 'State':
+        shard_conns = [conns[get_shard_index(state)]]
+    else:
+        shard_conns = conns  # the state's tracts can be on any node
+
+    rows = []
+    for conn in shard_conns:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT * FROM {TableName} WHERE State = %s;", (state,))
+            rows.extend(cursor.fetchall())
+    return rows
+
+
+def main():
+    initialize()
+    conns = [dbconnect(dsn) for dsn in DSNs]
+    rows = readdata(Datafile)
+
+    if CreateDB:
+        for conn in conns:
+            createTable(conn)
+
+    load(conns, rows)
+
+    if LookupState:
+        print(f"Found {len(lookup_state(conns, LookupState))} tracts in {LookupState}")
+
+
+if __name__ == "__main__":
+    main()
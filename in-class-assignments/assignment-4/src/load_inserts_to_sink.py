@@ -0,0 +1,262 @@
+# this program loads Census ACS data into a pluggable sink: Postgres, or an embedded DuckDB or SQLite database file
+# run it with -h to see the command line options
+
+# Every sink creates the same CensusData table and loads it through its engine's native bulk path:
+#   postgres - COPY ... FROM STDIN of the rows converted on the client
+#   duckdb   - DuckDB reads the data file itself with read_csv() and does the Year/null handling in SQL
+#   sqlite   - executemany() of the converted rows in a single transaction
+# The embedded sinks need no server, so the same command can fill a local database file for analysis or CI.
+
+import argparse
+import csv
+import io
+import os
+import sqlite3
+import time
+from typing import Optional, Any
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+Sink = 'postgres'  # one of Sinks
+DBfile = None  # database file of the embedded sinks, DBfiles[Sink] unless given
+DBfiles = {
+    'duckdb': 'census.duckdb',
+    'sqlite': 'census.sqlite',
+}
+
+Columns = [
+    ('Year', 'INTEGER'),
+    ('CensusTract', 'NUMERIC'),
+    ('State', 'TEXT'),
+    ('County', 'TEXT'),
+    ('TotalPop', 'INTEGER'),
+    ('Men', 'INTEGER'),
+    ('Women', 'INTEGER'),
+    ('Hispanic', 'DECIMAL'),
+    ('White', 'DECIMAL'),
+    ('Black', 'DECIMAL'),
+    ('Native', 'DECIMAL'),
+    ('Asian', 'DECIMAL'),
+    ('Pacific', 'DECIMAL'),
+    ('Citizen', 'DECIMAL'),
+    ('Income', 'DECIMAL'),
+    ('IncomeErr', 'DECIMAL'),
+    ('IncomePerCap', 'DECIMAL'),
+    ('IncomePerCapErr', 'DECIMAL'),
+    ('Poverty', 'DECIMAL'),
+    ('ChildPoverty', 'DECIMAL'),
+    ('Professional', 'DECIMAL'),
+    ('Service', 'DECIMAL'),
+    ('Office', 'DECIMAL'),
+    ('Construction', 'DECIMAL'),
+    ('Production', 'DECIMAL'),
+    ('Drive', 'DECIMAL'),
+    ('Carpool', 'DECIMAL'),
+    ('Transit', 'DECIMAL'),
+    ('Walk', 'DECIMAL'),
+    ('OtherTransp', 'DECIMAL'),
+    ('WorkAtHome', 'DECIMAL'),
+    ('MeanCommute', 'DECIMAL'),
+    ('Employed', 'INTEGER'),
+    ('PrivateWork', 'DECIMAL'),
+    ('PublicWork', 'DECIMAL'),
+    ('SelfEmployed', 'DECIMAL'),
+    ('FamilyWork', 'DECIMAL'),
+    ('Unemployment', 'DECIMAL')
+]
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+# the values of a data file row in CensusData column order
+def row2tuple(row):
+    row = row2vals(row)
+    return (Year,) + tuple(row[name] for name, _ in Columns[1:])
+
+
+def initialize():
+    global Year
+    global Sink
+    global DBfile
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-s", "--sink", choices=Sinks.keys(), default=Sink)
+    parser.add_argument("-f", "--dbfile",
+                        help=f"database file of the duckdb and sqlite sinks (default: {DBfiles})")
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = int(args.year)
+    Sink = args.sink
+    DBfile = args.dbfile or DBfiles.get(Sink)
+
+
+# read the input data file into a list of row strings
+# skip the header row
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        dr = csv.DictReader(fil)
+
+        rowlist = []
+        for row in dr:
+            rowlist.append(row)
+
+    return rowlist
+
+
+# the same statements work on all three engines
+def get_create_table_cmds():
+    column_defs = ",\n".join(f"{name} {column_type}" for name, column_type in Columns)
+    return [
+        f"DROP TABLE IF EXISTS {TableName};",
+        f"CREATE TABLE {TableName} ({column_defs}, PRIMARY KEY (Year, CensusTract));",
+        f"CREATE INDEX idx_{TableName}_State ON {TableName}(State);",
+    ]
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+class PostgresSink:
+
+    def __init__(self):
+        self._conn = psycopg2.connect(
+            host="localhost",
+            database=DBname,
+            user=DBuser,
+            password=DBpwd,
+        )
+        self._conn.autocommit = True
+
+    def create_table(self):
+        with self._conn.cursor() as cursor:
+            for cmd in get_create_table_cmds():
+                cursor.execute(cmd)
+
+    def load(self, datafile):
+        csv_file_like_object = io.StringIO()
+        for row in readdata(datafile):
+            csv_file_like_object.write('|'.join(map(clean_csv_value, row2tuple(row))) + '\n')
+        csv_file_like_object.seek(0)
+
+        with self._conn.cursor() as cursor:
+            cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH (FORMAT text, DELIMITER '|');", csv_file_like_object)
+
+    def close(self):
+        self._conn.close()
+
+
+class DuckDBSink:
+
+    def __init__(self):
+        # only needed for this sink, so the other sinks work without duckdb installed
+        import duckdb
+
+        self._conn = duckdb.connect(DBfile)
+
+    def create_table(self):
+        for cmd in get_create_table_cmds():
+            self._conn.execute(cmd)
+
+    def load(self, datafile):
+        # DuckDB parses the file itself, so the Year column and the null-to-zero and quote handling
+        # of row2vals() are done in SQL
+        file_columns = ", ".join(f"'{name}': '{'VARCHAR' if column_type == 'TEXT' else 'DOUBLE'}'"
+                                 for name, column_type in Columns[1:])
+        select_list = [str(Year)]
+        for name, column_type in Columns[1:]:
+            if name == 'County':
+                select_list.append("replace(County, '''', '')")
+            elif column_type == 'TEXT':
+                select_list.append(name)
+            else:
+                select_list.append(f"COALESCE({name}, 0)")
+
+        self._conn.execute(f"""
+            INSERT INTO {TableName}
+            SELECT {", ".join(select_list)}
+            FROM read_csv(?, header = true, columns = {{{file_columns}}});
+        """, [os.path.abspath(datafile)])
+
+    def close(self):
+        self._conn.close()
+
+
+class SQLiteSink:
+
+    def __init__(self):
+        self._conn = sqlite3.connect(DBfile)
+
+    def create_table(self):
+        with self._conn:
+            for cmd in get_create_table_cmds():
+                self._conn.execute(cmd)
+
+    def load(self, datafile):
+        placeholders = ", ".join("?" for _ in Columns)
+
+        # a single transaction for all rows instead of one per INSERT
+        with self._conn:
+            self._conn.executemany(f"INSERT INTO {TableName} VALUES ({placeholders});",
+                                   (row2tuple(row) for row in readdata(datafile)))
+
+    def close(self):
+        self._conn.close()
+
+
+Sinks = {
+    'postgres': PostgresSink,
+    'duckdb': DuckDBSink,
+    'sqlite': SQLiteSink,
+}
+
+
+def load(sink):
+    start = time.perf_counter()
+    print(f"Loading data into the {Sink} sink ...")
+
+    sink.load(Datafile)
+
+    elapsed = time.perf_counter() - start
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+def main():
+    initialize()
+    sink = Sinks[Sink]()
+
+    if CreateDB:
+        sink.create_table()
+        print(f"Created {TableName}")
+
+    load(sink)
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
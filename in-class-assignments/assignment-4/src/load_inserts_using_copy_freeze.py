@@ -0,0 +1,252 @@
+# this program loads Census ACS data using COPY ... WITH (FREEZE) followed by ANALYZE
+# run it with -h to see the command line options
+
+# COPY FREEZE writes the rows already frozen (with their hint bits set), which saves the
+# first queries and the first autovacuum from rewriting every page of the freshly loaded table.
+# Postgres only allows FREEZE when the table was created or truncated in the same transaction
+# as the COPY, so the table is (re)-created or truncated inside the load transaction.
+
+import argparse
+import csv
+import io
+import time
+from typing import Optional, Any
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+TruncateDB = False  # indicates whether the DB table should be truncated before loading
+Year = 2015
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-t", "--truncatetable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    global TruncateDB
+    TruncateDB = args.truncatetable
+    Year = args.year
+
+
+# read the input data file into a list of row strings
+# skip the header row
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        dr = csv.DictReader(fil)
+        headerRow = next(dr)
+        # print(f"Header: {headerRow}")
+
+        rowlist = []
+        for row in dr:
+            rowlist.append(row)
+
+    return rowlist
+
+
+# convert list of data rows into list of SQL 'INSERT INTO ...' commands
+def getSQLcmnds(rowlist):
+    cmdlist = []
+    for row in rowlist:
+        valstr = row2vals(row)
+        cmd = f"INSERT INTO {TableName} VALUES ({valstr});"
+        cmdlist.append(cmd)
+    return cmdlist
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = False
+    return connection
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+         	ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+         	CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+    	""")
+
+        print(f"Created {TableName}")
+
+
+def truncateTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE TABLE {TableName};")
+
+        print(f"Truncated {TableName}")
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+def load(conn, rows):
+    csv_file_like_object = io.StringIO()
+    for row in rows:
+        row = row2vals(row)
+        csv_file_like_object.write('|'.join(map(clean_csv_value, (
+            Year,
+            row['CensusTract'],
+            row['State'],
+            row['County'],
+            row['TotalPop'],
+            row['Men'],
+            row['Women'],
+            row['Hispanic'],
+            row['White'],
+            row['Black'],
+            row['Native'],
+            row['Asian'],
+            row['Pacific'],
+            row['Citizen'],
+            row['Income'],
+            row['IncomeErr'],
+            row['IncomePerCap'],
+            row['IncomePerCapErr'],
+            row['Poverty'],
+            row['ChildPoverty'],
+            row['Professional'],
+            row['Service'],
+            row['Office'],
+            row['Construction'],
+            row['Production'],
+            row['Drive'],
+            row['Carpool'],
+            row['Transit'],
+            row['Walk'],
+            row['OtherTransp'],
+            row['WorkAtHome'],
+            row['MeanCommute'],
+            row['Employed'],
+            row['PrivateWork'],
+            row['PublicWork'],
+            row['SelfEmployed'],
+            row['FamilyWork'],
+            row['Unemployment']
+        ))) + '\n')
+    csv_file_like_object.seek(0)
+
+    # FREEZE is only allowed when the table was created or truncated in this transaction
+    freeze = CreateDB or TruncateDB
+    copy_options = "FORMAT text, DELIMITER '|'" + (", FREEZE" if freeze else "")
+
+    with conn.cursor() as cursor:
+        start = time.perf_counter()
+        print(f"Loading data {'with' if freeze else 'without'} FREEZE ...")
+
+        cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH ({copy_options});", csv_file_like_object)
+
+        elapsed = time.perf_counter() - start
+
+    conn.commit()
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+# gather planner statistics right away instead of waiting for autovacuum to get to the new table
+def analyze(conn):
+    with conn.cursor() as cursor:
+        start = time.perf_counter()
+        print(f"Analyzing {TableName} ...")
+
+        cursor.execute(f"ANALYZE {TableName};")
+
+        elapsed = time.perf_counter() - start
+
+    conn.commit()
+    print(f'Finished Analyzing. Elapsed Time: {elapsed:0.4} seconds')
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+    rows = readdata(Datafile)
+
+    # the create/truncate, COPY and commit all happen in one transaction so that COPY can FREEZE
+    if CreateDB:
+        createTable(conn)
+    elif TruncateDB:
+        truncateTable(conn)
+
+    load(conn, rows)
+    analyze(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# this program loads Census ACS data inside the database server, using either a server-side
+# COPY ... FROM '<file>' or a file_fdw foreign table, followed by a single INSERT ... SELECT
+# run it with -h to see the command line options
+
+# Both modes need the data file to be readable by the Postgres server process, i.e. the loader
+# runs on the same host as the database. The Year column and the null-to-zero handling that
+# row2vals() does in the other loaders happen in SQL instead, so no row is parsed by Python.
+# When the server cannot read the file, the client streams the raw file through
+# COPY ... FROM STDIN into the same staging table instead.
+
+import argparse
+import os
+import time
+
+import psycopg2
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+Mode = 'copy'  # 'copy' for a server-side COPY into a staging table, 'fdw' for a file_fdw foreign table
+
+FdwServerName = 'census_files'
+
+# columns of the ACS data file, in file order. Every column except State and County is numeric.
+FileColumns = [
+    'CensusTract', 'State', 'County', 'TotalPop', 'Men', 'Women', 'Hispanic', 'White', 'Black', 'Native',
+    'Asian', 'Pacific', 'Citizen', 'Income', 'IncomeErr', 'IncomePerCap', 'IncomePerCapErr', 'Poverty',
+    'ChildPoverty', 'Professional', 'Service', 'Office', 'Construction', 'Production', 'Drive', 'Carpool',
+    'Transit', 'Walk', 'OtherTransp', 'WorkAtHome', 'MeanCommute', 'Employed', 'PrivateWork', 'PublicWork',
+    'SelfEmployed', 'FamilyWork', 'Unemployment'
+]
+TextColumns = {'State', 'County'}
+
+
+def initialize():
+    global Year
+    global Mode
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile", required=True)
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-m", "--mode", choices=['copy', 'fdw'], default=Mode)
+    args = parser.parse_args()
+
+    global Datafile
+    Datafile = os.path.abspath(args.datafile)  # the server resolves relative paths against its data directory
+    global CreateDB
+    CreateDB = args.createtable
+    Mode = args.mode
+    Year = args.year
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = True
+    return connection
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+         	ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+         	CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+    	""")
+
+        print(f"Created {TableName}")
+
+
+def get_staging_table_name():
+    return TableName + "_staging"
+
+
+def get_foreign_table_name():
+    return TableName + "_file"
+
+
+# column definitions matching the data file (no Year column)
+def get_file_column_defs():
+    return ",\n".join(f"{column} {'TEXT' if column in TextColumns else 'NUMERIC'}" for column in FileColumns)
+
+
+# the SELECT list that turns a raw data file row into a CensusData row: inject the Year,
+# replace nulls with 0 and eliminate quotes within County, the same way row2vals() does
+def get_transform_select_list():
+    select_list = [str(int(Year))]
+    for column in FileColumns:
+        if column == 'County':
+            select_list.append("replace(County, '''', '')")
+        elif column in TextColumns:
+            select_list.append(column)
+        else:
+            select_list.append(f"COALESCE({column}, 0)")
+    return ",\n".join(select_list)
+
+
+# check whether the server process itself can read the data file by reading its first byte
+def server_can_read_file(conn):
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_read_binary_file(%s, 0, 1);", (Datafile,))
+            return True
+    except psycopg2.Error as ex:
+        # e.g. the file is on another host, or the user is not a member of pg_read_server_files
+        print(f"Unable to read {Datafile} on the server: {ex}")
+        return False
+
+
+def createStagingTable(conn):
+    with conn.cursor() as cursor:
+        staging_table_name = get_staging_table_name()
+        cursor.execute(f"""
+            DROP TABLE IF EXISTS {staging_table_name};
+            CREATE UNLOGGED TABLE {staging_table_name} (
+                {get_file_column_defs()}
+            );
+        """)
+
+        print(f"Created {staging_table_name}")
+
+
+def createForeignTable(conn):
+    with conn.cursor() as cursor:
+        foreign_table_name = get_foreign_table_name()
+        cursor.execute(f"""
+            CREATE EXTENSION IF NOT EXISTS file_fdw;
+            CREATE SERVER IF NOT EXISTS {FdwServerName} FOREIGN DATA WRAPPER file_fdw;
+            DROP FOREIGN TABLE IF EXISTS {foreign_table_name};
+            CREATE FOREIGN TABLE {foreign_table_name} (
+                {get_file_column_defs()}
+            ) SERVER {FdwServerName}
+            OPTIONS (filename %s, format 'csv', header 'true');
+        """, (Datafile,))
+
+        print(f"Created {foreign_table_name} over {Datafile}")
+
+
+# fill the staging table with the raw data file, read by the server itself when possible
+def copyToStagingTable(conn, server_side):
+    with conn.cursor() as cursor:
+        staging_table_name = get_staging_table_name()
+        if server_side:
+            print(f"Copying {Datafile} into {staging_table_name} on the server ...")
+            cursor.execute(f"COPY {staging_table_name} FROM %s WITH (FORMAT csv, HEADER true);", (Datafile,))
+        else:
+            # the client only passes the bytes through, all parsing is still done by the server
+            print(f"Streaming {Datafile} into {staging_table_name} from the client ...")
+            with open(Datafile, mode="r") as file:
+                cursor.copy_expert(f"COPY {staging_table_name} FROM STDIN WITH (FORMAT csv, HEADER true);", file)
+
+
+def insertFromSourceTable(conn, source_table_name):
+    with conn.cursor() as cursor:
+        print(f"Inserting from {source_table_name} into {TableName} ...")
+        cursor.execute(f"""
+            INSERT INTO {TableName}
+            SELECT
+                {get_transform_select_list()}
+            FROM {source_table_name};
+        """)
+
+        print(f"Inserted {cursor.rowcount} rows")
+
+
+# returns False if the foreign table could not be used, e.g. because file_fdw is not installed on the server
+def loadThroughForeignTable(conn):
+    try:
+        createForeignTable(conn)
+        insertFromSourceTable(conn, get_foreign_table_name())
+    except psycopg2.Error as ex:
+        print(f"Unable to load through file_fdw, falling back to COPY: {ex}")
+        return False
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP FOREIGN TABLE {get_foreign_table_name()};")
+    return True
+
+
+def loadThroughStagingTable(conn, server_side):
+    createStagingTable(conn)
+    copyToStagingTable(conn, server_side)
+    insertFromSourceTable(conn, get_staging_table_name())
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {get_staging_table_name()};")
+
+
+def load(conn):
+    start = time.perf_counter()
+    print(f"Loading data ...")
+
+    server_side = server_can_read_file(conn)
+    if not server_side:
+        print(f"The server cannot read {Datafile}, falling back to loading through the client")
+
+    if not (Mode == 'fdw' and server_side and loadThroughForeignTable(conn)):
+        loadThroughStagingTable(conn, server_side)
+
+    elapsed = time.perf_counter() - start
+    print(f'Finished Loading. Elapsed Time: {elapsed:0.4} seconds')
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+
+    if CreateDB:
+        createTable(conn)
+
+    load(conn)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+# this program loads Census ACS data with COPY and incrementally maintains a county-level rollup table
+# run it with -h to see the command line options
+
+# The rollup keeps, per (Year, State, County), the total population and the population-weighted sums of
+# IncomePerCap and Poverty, the same aggregation the assignment-5 notebook does with groupby().apply().
+# The rows are loaded in batches: every batch is aggregated by county on the client and merged into the
+# rollup with INSERT ... ON CONFLICT DO UPDATE, in the same transaction as the COPY of the batch, so the
+# rollup always matches CensusData. Per-county lookups then read one precomputed row instead of every tract.
+
+import argparse
+import csv
+import io
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import Optional, Any
+
+import psycopg2
+import psycopg2.extras
+
+DBname = "census_db"
+DBuser = "pkaran"
+DBpwd = "800"
+TableName = 'CensusData'
+Datafile = "filedoesnotexist"  # name of the data file to be loaded
+CreateDB = False  # indicates whether the DB table should be (re)-created
+Year = 2015
+BatchSize = 10000  # rows loaded, and merged into the rollup, per transaction
+RebuildRollup = False  # recompute the rollup from all of CensusData instead of loading
+LookupCounty = None  # (State, County) to look up in the rollup
+
+
+def row2vals(row):
+    # handle the null vals
+    for key in row:
+        if not row[key]:
+            row[key] = 0
+        row['County'] = row['County'].replace('\'', '')  # eliminate quotes within literals
+
+    return row
+
+
+def initialize():
+    global Year
+    global BatchSize
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--datafile")
+    parser.add_argument("-c", "--createtable", action="store_true")
+    parser.add_argument("-y", "--year", default=Year)
+    parser.add_argument("-b", "--batchsize", type=int, default=BatchSize)
+    parser.add_argument("-r", "--rebuildrollup", action="store_true",
+                        help="recompute the county rollup from all of CensusData")
+    parser.add_argument("-l", "--lookup", nargs=2, metavar=("STATE", "COUNTY"),
+                        help="print the rollup of a county")
+    args = parser.parse_args()
+    if not (args.datafile or args.rebuildrollup or args.lookup):
+        parser.error("one of --datafile, --rebuildrollup or --lookup is required")
+
+    global Datafile
+    Datafile = args.datafile
+    global CreateDB
+    CreateDB = args.createtable
+    Year = int(args.year)
+    BatchSize = args.batchsize
+    global RebuildRollup
+    RebuildRollup = args.rebuildrollup
+    global LookupCounty
+    LookupCounty = args.lookup
+
+
+# stream the rows of the input data file, without holding the whole file in memory
+def readdata(fname):
+    print(f"readdata: reading from File: {fname}")
+    with open(fname, mode="r") as fil:
+        for row in csv.DictReader(fil):
+            yield row
+
+
+# connect to the database
+def dbconnect():
+    connection = psycopg2.connect(
+        host="localhost",
+        database=DBname,
+        user=DBuser,
+        password=DBpwd,
+    )
+    connection.autocommit = False
+    return connection
+
+
+def get_rollup_table_name():
+    return TableName + "_county"
+
+
+# create the target table
+# assumes that conn is a valid, open connection to a Postgres database
+def createTable(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+        	DROP TABLE IF EXISTS {TableName};
+        	CREATE TABLE {TableName} (
+            	Year                INTEGER,
+              CensusTract         NUMERIC,
+            	State               TEXT,
+            	County              TEXT,
+            	TotalPop            INTEGER,
+            	Men                 INTEGER,
+            	Women               INTEGER,
+            	Hispanic            DECIMAL,
+            	White               DECIMAL,
+            	Black               DECIMAL,
+            	Native              DECIMAL,
+            	Asian               DECIMAL,
+            	Pacific             DECIMAL,
+            	Citizen             DECIMAL,
+            	Income              DECIMAL,
+            	IncomeErr           DECIMAL,
+            	IncomePerCap        DECIMAL,
+            	IncomePerCapErr     DECIMAL,
+            	Poverty             DECIMAL,
+            	ChildPoverty        DECIMAL,
+            	Professional        DECIMAL,
+            	Service             DECIMAL,
+            	Office              DECIMAL,
+            	Construction        DECIMAL,
+            	Production          DECIMAL,
+            	Drive               DECIMAL,
+            	Carpool             DECIMAL,
+            	Transit             DECIMAL,
+            	Walk                DECIMAL,
+            	OtherTransp         DECIMAL,
+            	WorkAtHome          DECIMAL,
+            	MeanCommute         DECIMAL,
+            	Employed            INTEGER,
+            	PrivateWork         DECIMAL,
+            	PublicWork          DECIMAL,
+            	SelfEmployed        DECIMAL,
+            	FamilyWork          DECIMAL,
+            	Unemployment        DECIMAL
+         	);	
+         	ALTER TABLE {TableName} ADD PRIMARY KEY (Year, CensusTract);
+         	CREATE INDEX idx_{TableName}_State ON {TableName}(State);
+    	""")
+
+        print(f"Created {TableName}")
+
+
+# the weighted averages are generated columns, so they stay in step with every merged batch
+def createRollupTable(conn):
+    with conn.cursor() as cursor:
+        rollup_table_name = get_rollup_table_name()
+        cursor.execute(f"""
+            DROP TABLE IF EXISTS {rollup_table_name};
+            CREATE TABLE {rollup_table_name} (
+                Year                INTEGER,
+                State               TEXT,
+                County              TEXT,
+                TotalPop            BIGINT,
+                IncomePerCapPopSum  DECIMAL,
+                PovertyPopSum       DECIMAL,
+                IncomePerCap        DECIMAL GENERATED ALWAYS AS (ROUND(IncomePerCapPopSum / NULLIF(TotalPop, 0), 2)) STORED,
+                Poverty             DECIMAL GENERATED ALWAYS AS (ROUND(PovertyPopSum / NULLIF(TotalPop, 0), 2)) STORED,
+                PRIMARY KEY (Year, State, County)
+            );
+        """)
+
+        print(f"Created {rollup_table_name}")
+
+
+# recompute the rollup from everything in CensusData, e.g. for data loaded by the other loaders
+def rebuildRollup(conn):
+    with conn.cursor() as cursor:
+        rollup_table_name = get_rollup_table_name()
+        cursor.execute(f"""
+            TRUNCATE TABLE {rollup_table_name};
+            INSERT INTO {rollup_table_name} (Year, State, County, TotalPop, IncomePerCapPopSum, PovertyPopSum)
+            SELECT Year, State, County, SUM(TotalPop), SUM(IncomePerCap * TotalPop), SUM(Poverty * TotalPop)
+            FROM {TableName}
+            GROUP BY Year, State, County;
+        """)
+
+        print(f"Rebuilt {rollup_table_name} with {cursor.rowcount} counties")
+    conn.commit()
+
+
+def clean_csv_value(value: Optional[Any]) -> str:
+    if value is None:
+        return r'\N'
+    return str(value).replace('\n', '\\n')
+
+
+def row2line(row):
+    return '|'.join(map(clean_csv_value, (
+        Year,
+        row['CensusTract'],
+        row['State'],
+        row['County'],
+        row['TotalPop'],
+        row['Men'],
+        row['Women'],
+        row['Hispanic'],
+        row['White'],
+        row['Black'],
+        row['Native'],
+        row['Asian'],
+        row['Pacific'],
+        row['Citizen'],
+        row['Income'],
+        row['IncomeErr'],
+        row['IncomePerCap'],
+        row['IncomePerCapErr'],
+        row['Poverty'],
+        row['ChildPoverty'],
+        row['Professional'],
+        row['Service'],
+        row['Office'],
+        row['Construction'],
+        row['Production'],
+        row['Drive'],
+        row['Carpool'],
+        row['Transit'],
+        row['Walk'],
+        row['OtherTransp'],
+        row['WorkAtHome'],
+        row['MeanCommute'],
+        row['Employed'],
+        row['PrivateWork'],
+        row['PublicWork'],
+        row['SelfEmployed'],
+        row['FamilyWork'],
+        row['Unemployment']
+    ))) + '\n'
+
+
+# COPY one batch and merge its county aggregates into the rollup, in one transaction
+def load_batch(conn, batch):
+    csv_file_like_object = io.StringIO()
+    county_sums = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+    for row in batch:
+        csv_file_like_object.write(row2line(row))
+
+        total_pop = int(Decimal(row['TotalPop']))  # also written as a float, e.g. '1234.0', or a blank made 0
+        sums = county_sums[(row['State'], row['County'])]
+        sums[0] += total_pop
+        sums[1] += Decimal(row['IncomePerCap']) * total_pop
+        sums[2] += Decimal(row['Poverty']) * total_pop
+    csv_file_like_object.seek(0)
+
+    with conn.cursor() as cursor:
+        cursor.copy_expert(f"COPY {TableName} FROM STDIN WITH (FORMAT text, DELIMITER '|');", csv_file_like_object)
+
+        rollup_table_name = get_rollup_table_name()
+        psycopg2.extras.execute_batch(cursor, f"""
+            INSERT INTO {rollup_table_name} AS rollup (Year, State, County, TotalPop, IncomePerCapPopSum, PovertyPopSum)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (Year, State, County) DO UPDATE SET
+                TotalPop = rollup.TotalPop + EXCLUDED.TotalPop,
+                IncomePerCapPopSum = rollup.IncomePerCapPopSum + EXCLUDED.IncomePerCapPopSum,
+                PovertyPopSum = rollup.PovertyPopSum + EXCLUDED.PovertyPopSum;
+        """, [(Year, state, county, *sums) for (state, county), sums in county_sums.items()], page_size=1000)
+
+    conn.commit()
+
+
+def load(conn, rows):
+    start = time.perf_counter()
+    print(f"Loading data in batches of {BatchSize} rows ...")
+
+    row_count = 0
+    batch = []
+    for row in rows:
+        batch.append(row2vals(row))
+        if len(batch) >= BatchSize:
+            load_batch(conn, batch)
+            row_count += len(batch)
+            batch = []
+    if batch:
+        load_batch(conn, batch)
+        row_count += len(batch)
+
+    elapsed = time.perf_counter() - start
+    print(f'Finished Loading {row_count} rows. Elapsed Time: {elapsed:0.4} seconds')
+
+
+# the rollup of a county for every loaded year
+def get_county_summary(conn, state, county):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT Year, State, County, TotalPop, IncomePerCap, Poverty
+            FROM {get_rollup_table_name()}
+            WHERE State = %s AND County = %s
+            ORDER BY Year;
+        """, (state, county))
+        return cursor.fetchall()
+
+
+def main():
+    initialize()
+    conn = dbconnect()
+
+    if CreateDB:
+        createTable(conn)
+        createRollupTable(conn)
+        conn.commit()
+
+    if RebuildRollup:
+        rebuildRollup(conn)
+    elif Datafile:
+        load(conn, readdata(Datafile))
+
+    if LookupCounty:
+        for summary in get_county_summary(conn, *LookupCounty):
+            print(summary)
+
+
+if __name__ == "__main__":
+    main()